@@ -1,7 +1,16 @@
 # services/ai-gateway/app.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import ORJSONResponse, Response
+import asyncio
 import logging
+import logging.handlers
+import queue
+import sys
+import orjson
 from utils.config import load_config
 
 # Import route modules
@@ -10,22 +19,107 @@ from routes import ai_routes, voice_routes, system_routes, workflow_routes, file
 # Configuration
 config = load_config()
 
+# Hand log records to a background thread so handler I/O never blocks the event
+# loop; the queue handler is only installed while the listener is draining it
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(
+    log_queue,
+    logging.StreamHandler(sys.stdout),
+    respect_handler_level=True
+)
+root_logger = logging.getLogger()
+root_logger.setLevel(config.get('log_level', 'info').upper())
+
+# Use uvloop when available (not supported on Windows); the policy is only
+# installed when this module runs the server, never on import
+try:
+    import uvloop
+    LOOP_IMPL = "uvloop"
+except ImportError:
+    LOOP_IMPL = "asyncio"
+
+try:
+    import httptools  # noqa: F401
+    HTTP_IMPL = "httptools"
+except ImportError:
+    HTTP_IMPL = "h11"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize all services on startup and clean them up on shutdown"""
+    log_listener.start()
+    previous_handlers = root_logger.handlers[:]
+    root_logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    try:
+        # Each route module handles its own initialization; the system
+        # routes own the command processor that the AI routes share
+        await system_routes.initialize()
+        await asyncio.gather(
+            ai_routes.initialize(system_routes.command_processor),
+            workflow_routes.initialize(),
+            monitoring_routes.initialize()
+        )
+        logging.info("AI Gateway with Workflow Automation started successfully")
+        yield
+        await asyncio.gather(
+            ai_routes.cleanup(),
+            workflow_routes.cleanup(),
+            monitoring_routes.cleanup()
+        )
+        await system_routes.cleanup()
+    finally:
+        root_logger.handlers[:] = previous_handlers
+        log_listener.stop()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="AI Assistant Gateway",
     description="Unified AI and voice processing service with Workflow Automation",
-    version="2.5.0"
+    version="2.5.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# CORS middleware
+# CORS middleware, only needed when browsers call the gateway directly
+# (the desktop client talks to it from the Electron main process)
+if config.get('cors_enabled', False):
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=config.get('cors_origins', ['*']),
+        allow_credentials=True,
+        allow_methods=["GET", "POST"],
+        allow_headers=["Content-Type", "Authorization"],
+    )
+
+# Reject requests with unexpected Host headers before routing
+app.add_middleware(TrustedHostMiddleware, allowed_hosts=config.get('allowed_hosts', ['*']))
+
+# Responses whose bodies are already-encoded audio are sent as-is
+GZIP_EXCLUDED_PATHS = frozenset({"/v1/voice/synthesize"})
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that passes GZIP_EXCLUDED_PATHS through uncompressed"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in GZIP_EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Compress larger JSON payloads
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=config.get('cors_origins', ['*']),
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    SelectiveGZipMiddleware,
+    minimum_size=config.get('gzip_minimum_size', 512),
+    compresslevel=config.get('gzip_level', 5)
 )
 
+LIVEZ_BODY = orjson.dumps({"status": "ok"})
+
+@app.get("/livez")
+async def livez():
+    """Liveness probe: the process is up, no dependencies are contacted"""
+    return Response(LIVEZ_BODY, media_type="application/json")
+
 # Include all route modules
 app.include_router(ai_routes.router, prefix="/v1")
 app.include_router(voice_routes.router, prefix="/v1")
@@ -34,27 +128,23 @@ app.include_router(workflow_routes.router, prefix="/v1")
 app.include_router(file_routes.router, prefix="/v1")
 app.include_router(monitoring_routes.router, prefix="/v1")
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize all services on startup"""
-    # Each route module handles its own initialization
-    await ai_routes.initialize()
-    await workflow_routes.initialize()
-    await monitoring_routes.initialize()
-    logging.info("AI Gateway with Workflow Automation started successfully")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Cleanup all services on shutdown"""
-    await ai_routes.cleanup()
-    await workflow_routes.cleanup()
-    await monitoring_routes.cleanup()
-
+# Production deployments should run behind gunicorn so heavy imports happen
+# once in the parent and are shared copy-on-write with the workers:
+#   gunicorn -k uvicorn.workers.UvicornWorker -w <2 x cores> --preload app:app
+# Each worker has its own log listener, system monitor, shell pool and caches,
+# so metrics, alerts and cached state only describe one worker. The dev server
+# therefore runs a single worker unless 'workers' is configured.
 if __name__ == "__main__":
     import uvicorn
+    if LOOP_IMPL == "uvloop":
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     uvicorn.run(
-        app,
+        "app:app",
+        workers=config.get('workers', 1),
         host=config.get('host', '0.0.0.0'),
         port=config.get('port', 8000),
-        log_level=config.get('log_level', 'info')
+        log_level=config.get('log_level', 'info'),
+        loop=LOOP_IMPL,
+        http=HTTP_IMPL,
+        interface="asgi3"
     )
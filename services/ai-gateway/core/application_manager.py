@@ -2,23 +2,394 @@
 import os
 import subprocess
 import asyncio
+import functools
 import psutil
 import logging
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 from pathlib import Path
 import platform
+import re
+import signal
+import sys
+import time
+from dataclasses import dataclass, field
+
+# The platform cannot change at runtime, so resolve it once
+_SYSTEM = platform.system()
+
+# Windows has no SIGKILL; os.kill terminates the process for any signal there
+_FORCE_KILL_SIGNAL = getattr(signal, 'SIGKILL', signal.SIGTERM)
+
+# How long a get_running_applications() result is reused, and how long a failed scan is
+RUNNING_APPS_CACHE_TTL = 1.0
+RUNNING_APPS_FAILURE_TTL = 0.2
+
+# Distinct process names remembered by the name matchers; bounded because a
+# long-running host keeps producing new ones (versioned helpers, PIDs in names)
+PROCESS_NAME_MEMO_SIZE = 4096
+
+# Status lines echoed by the persistent osascript REPL after each command
+_OSASCRIPT_OK = b"__kruboo_osascript_ok__"
+_OSASCRIPT_ERROR = b"__kruboo_osascript_error__"
+# Each command runs in a try block whose value, echoed by the REPL, says
+# whether it succeeded
+_OSASCRIPT_WRAPPER = (
+    'try\n'
+    '%s\n'
+    '"' + _OSASCRIPT_OK.decode() + '"\n'
+    'on error errorMessage number errorNumber\n'
+    '"' + _OSASCRIPT_ERROR.decode() + ' " & errorNumber & " " & errorMessage\n'
+    'end try\n'
+)
+
+# Default application executable paths per platform
+_PLATFORM_APP_PATHS = {
+    'Darwin': {
+        'chrome': "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+        'vscode': "/Applications/Visual Studio Code.app/Contents/MacOS/Electron",
+        'slack': "/Applications/Slack.app/Contents/MacOS/Slack",
+        'photoshop': "/Applications/Adobe Photoshop 2023/Adobe Photoshop 2023.app/Contents/MacOS/Adobe Photoshop 2023",
+        'excel': "/Applications/Microsoft Excel.app/Contents/MacOS/Microsoft Excel",
+        'word': "/Applications/Microsoft Word.app/Contents/MacOS/Microsoft Word"
+    },
+    'Windows': {
+        'chrome': "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
+        'vscode': "C:\\Users\\{}\\AppData\\Local\\Programs\\Microsoft VS Code\\Code.exe",
+        'slack': "C:\\Users\\{}\\AppData\\Local\\slack\\slack.exe",
+        'photoshop': "C:\\Program Files\\Adobe\\Adobe Photoshop 2023\\Photoshop.exe",
+        'excel': "C:\\Program Files\\Microsoft Office\\root\\Office16\\EXCEL.EXE",
+        'word': "C:\\Program Files\\Microsoft Office\\root\\Office16\\WINWORD.EXE"
+    },
+    # Linux and anything else
+    None: {
+        'chrome': "/usr/bin/google-chrome",
+        'vscode': "/usr/bin/code",
+        'slack': "/usr/bin/slack",
+        'photoshop': "",
+        'excel': "",
+        'word': ""
+    }
+}
+_APP_PATHS = _PLATFORM_APP_PATHS.get(_SYSTEM, _PLATFORM_APP_PATHS[None])
+
+def _read_boot_time() -> float:
+    with open('/proc/stat', 'rb') as f:
+        for line in f:
+            if line.startswith(b'btime '):
+                return float(line.split()[1])
+    return 0.0
+
+if _SYSTEM == 'Linux':
+    _CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+    _BOOT_TIME = _read_boot_time()
+
+# The kernel truncates a process's comm (the stat name) to 15 bytes
+_COMM_MAX_LENGTH = 15
+
+def _untruncated_name(pid: str, comm: bytes) -> bytes:
+    """Full name for a possibly truncated comm, taken from argv[0] like psutil does"""
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            argv0 = f.read().split(b'\0', 1)[0]
+    except OSError:
+        return comm
+    extended = os.path.basename(argv0)
+    return extended if extended.startswith(comm) else comm
+
+def _iter_procs_linux():
+    """Yield (process, name, pid, create_time) straight from procfs.
+
+    A single /proc/<pid>/stat read gives everything the scans need, which is
+    far cheaper than psutil gathering its per-process state. Only names that
+    may have been truncated to 15 bytes also read /proc/<pid>/cmdline.
+    """
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'rb') as f:
+                stat = f.read()
+        except OSError:
+            # Process exited or is not readable
+            continue
+        # The name is wrapped in parentheses and may itself contain spaces or ')'
+        name_start = stat.find(b'(')
+        name_end = stat.rfind(b')')
+        name = stat[name_start + 1:name_end]
+        if len(name) >= _COMM_MAX_LENGTH:
+            name = _untruncated_name(entry, name)
+        # Names repeat across scans and key the memo caches, so share one copy
+        name = sys.intern(name.decode(errors='replace'))
+        yield None, name, int(entry), _stat_create_time(stat, name_end)
+
+def _stat_create_time(stat: bytes, name_end: int) -> float:
+    """Creation time from a /proc/<pid>/stat line whose name ends at name_end"""
+    # starttime is field 22; fields after the name start at field 3
+    start_ticks = int(stat[name_end + 2:].split()[19])
+    return _BOOT_TIME + start_ticks / _CLOCK_TICKS
+
+def _process_create_time(pid: int) -> Optional[float]:
+    """Creation time of a live PID, computed as the scans do, or None if it is gone"""
+    if _SYSTEM == 'Linux':
+        try:
+            with open(f'/proc/{pid}/stat', 'rb') as f:
+                stat = f.read()
+        except OSError:
+            return None
+        return _stat_create_time(stat, stat.rfind(b')'))
+    try:
+        return psutil.Process(pid).create_time()
+    except psutil.Error:
+        return None
+
+@dataclass(slots=True, frozen=True)
+class _NativeInput:
+    # activate(pids) raises a window owned by one of pids; True once it is focused
+    activate: Callable[[set], bool]
+    # send(key, control, pids) types into the focused window only if one of pids owns it
+    send: Callable[[str, bool, set], bool]
+
+@functools.lru_cache(maxsize=1)
+def _load_native_input():
+    """Bind the native window and keystroke APIs for this platform, or None if unavailable.
+
+    Calling user32/libxdo in-process avoids spawning a window or keystroke
+    tool for every shortcut. Bound on first use, so importing this module
+    never opens a display connection.
+    """
+    try:
+        import ctypes
+        if _SYSTEM == 'Windows':
+            from ctypes import wintypes
+            ULONG_PTR = ctypes.c_size_t
+
+            class MOUSEINPUT(ctypes.Structure):
+                _fields_ = [("dx", wintypes.LONG), ("dy", wintypes.LONG),
+                            ("mouseData", wintypes.DWORD), ("dwFlags", wintypes.DWORD),
+                            ("time", wintypes.DWORD), ("dwExtraInfo", ULONG_PTR)]
+
+            class KEYBDINPUT(ctypes.Structure):
+                _fields_ = [("wVk", wintypes.WORD), ("wScan", wintypes.WORD),
+                            ("dwFlags", wintypes.DWORD), ("time", wintypes.DWORD),
+                            ("dwExtraInfo", ULONG_PTR)]
+
+            class HARDWAREINPUT(ctypes.Structure):
+                _fields_ = [("uMsg", wintypes.DWORD), ("wParamL", wintypes.WORD),
+                            ("wParamH", wintypes.WORD)]
+
+            class _INPUTUNION(ctypes.Union):
+                # MOUSEINPUT is part of the union so sizeof(INPUT) matches Win32
+                _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT), ("hi", HARDWAREINPUT)]
+
+            class INPUT(ctypes.Structure):
+                _fields_ = [("type", wintypes.DWORD), ("u", _INPUTUNION)]
+
+            user32 = ctypes.WinDLL('user32', use_last_error=True)
+            user32.SendInput.argtypes = (wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int)
+            user32.SendInput.restype = wintypes.UINT
+            user32.GetForegroundWindow.argtypes = ()
+            user32.GetForegroundWindow.restype = wintypes.HWND
+            user32.GetWindowThreadProcessId.argtypes = (wintypes.HWND, ctypes.POINTER(wintypes.DWORD))
+            user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+            WNDENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+            user32.EnumWindows.argtypes = (WNDENUMPROC, wintypes.LPARAM)
+            user32.EnumWindows.restype = wintypes.BOOL
+            user32.IsWindowVisible.argtypes = (wintypes.HWND,)
+            user32.IsWindowVisible.restype = wintypes.BOOL
+            user32.SetForegroundWindow.argtypes = (wintypes.HWND,)
+            user32.SetForegroundWindow.restype = wintypes.BOOL
+
+            INPUT_KEYBOARD = 1
+            KEYEVENTF_KEYUP = 0x0002
+            VK_CONTROL = 0x11
+
+            def send(key: str, control: bool, pids) -> bool:
+                # SendInput types into the foreground window, so it must be the app's
+                window = user32.GetForegroundWindow()
+                owner = wintypes.DWORD()
+                if not window or not user32.GetWindowThreadProcessId(window, ctypes.byref(owner)):
+                    return False
+                if owner.value not in pids:
+                    return False
+                vk = ord(key.upper())
+                events = [(vk, 0), (vk, KEYEVENTF_KEYUP)]
+                if control:
+                    events = [(VK_CONTROL, 0)] + events + [(VK_CONTROL, KEYEVENTF_KEYUP)]
+                inputs = (INPUT * len(events))(*(
+                    INPUT(type=INPUT_KEYBOARD, u=_INPUTUNION(ki=KEYBDINPUT(wVk=code, dwFlags=flags)))
+                    for code, flags in events
+                ))
+                return user32.SendInput(len(events), inputs, ctypes.sizeof(INPUT)) == len(events)
+
+            def activate(pids) -> bool:
+                # EnumWindows walks top-level windows in Z order, so the first
+                # visible one owned by the app is its frontmost
+                found = []
+
+                def visit(window, _):
+                    owner = wintypes.DWORD()
+                    if (user32.IsWindowVisible(window)
+                            and user32.GetWindowThreadProcessId(window, ctypes.byref(owner))
+                            and owner.value in pids):
+                        found.append(window)
+                        return False
+                    return True
+
+                user32.EnumWindows(WNDENUMPROC(visit), 0)
+                return bool(found) and bool(user32.SetForegroundWindow(found[0]))
+
+            return _NativeInput(activate, send)
+
+        if _SYSTEM == 'Linux':
+            libxdo = ctypes.CDLL('libxdo.so.3')
+            libxdo.xdo_new.argtypes = (ctypes.c_char_p,)
+            libxdo.xdo_new.restype = ctypes.c_void_p
+            libxdo.xdo_send_keysequence_window.argtypes = (
+                ctypes.c_void_p, ctypes.c_ulong, ctypes.c_char_p, ctypes.c_uint)
+            libxdo.xdo_send_keysequence_window.restype = ctypes.c_int
+            libxdo.xdo_get_active_window.argtypes = (ctypes.c_void_p, ctypes.POINTER(ctypes.c_ulong))
+            libxdo.xdo_get_active_window.restype = ctypes.c_int
+            libxdo.xdo_get_pid_window.argtypes = (ctypes.c_void_p, ctypes.c_ulong)
+            libxdo.xdo_get_pid_window.restype = ctypes.c_int
+            libxdo.xdo_activate_window.argtypes = (ctypes.c_void_p, ctypes.c_ulong)
+            libxdo.xdo_activate_window.restype = ctypes.c_int
+            libxdo.xdo_wait_for_window_active.argtypes = (ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int)
+            libxdo.xdo_wait_for_window_active.restype = ctypes.c_int
+            # libxdo has no plain window listing, so the EWMH client list is
+            # read from the root window through Xlib
+            x11 = ctypes.CDLL('libX11.so.6')
+            x11.XOpenDisplay.argtypes = (ctypes.c_char_p,)
+            x11.XOpenDisplay.restype = ctypes.c_void_p
+            x11.XDefaultRootWindow.argtypes = (ctypes.c_void_p,)
+            x11.XDefaultRootWindow.restype = ctypes.c_ulong
+            x11.XInternAtom.argtypes = (ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int)
+            x11.XInternAtom.restype = ctypes.c_ulong
+            x11.XGetWindowProperty.argtypes = (
+                ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_long, ctypes.c_long,
+                ctypes.c_int, ctypes.c_ulong, ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_int),
+                ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_ulong),
+                ctypes.POINTER(ctypes.POINTER(ctypes.c_ulong)))
+            x11.XGetWindowProperty.restype = ctypes.c_int
+            x11.XFree.argtypes = (ctypes.c_void_p,)
+            x11.XFree.restype = ctypes.c_int
+            xdo = libxdo.xdo_new(None)
+            display = x11.XOpenDisplay(None)
+            if not xdo or not display:
+                # No X display to talk to
+                return None
+            root = x11.XDefaultRootWindow(display)
+            client_list_atom = x11.XInternAtom(display, b"_NET_CLIENT_LIST", 0)
+            XA_WINDOW = 33
+            MAX_CLIENTS = 4096
+
+            def send(key: str, control: bool, pids) -> bool:
+                # Address the active window explicitly, and only if it is the app's
+                window = ctypes.c_ulong()
+                if libxdo.xdo_get_active_window(xdo, ctypes.byref(window)) != 0:
+                    return False
+                if libxdo.xdo_get_pid_window(xdo, window.value) not in pids:
+                    return False
+                sequence = f"ctrl+{key}" if control else key
+                return libxdo.xdo_send_keysequence_window(xdo, window.value, sequence.encode(), 12000) == 0
+
+            def activate(pids) -> bool:
+                actual_type, actual_format = ctypes.c_ulong(), ctypes.c_int()
+                count, remaining = ctypes.c_ulong(), ctypes.c_ulong()
+                data = ctypes.POINTER(ctypes.c_ulong)()
+                status = x11.XGetWindowProperty(
+                    display, root, client_list_atom, 0, MAX_CLIENTS, 0, XA_WINDOW,
+                    ctypes.byref(actual_type), ctypes.byref(actual_format),
+                    ctypes.byref(count), ctypes.byref(remaining), ctypes.byref(data))
+                if status != 0 or not data:
+                    return False
+                try:
+                    # Format-32 properties come back as an array of C longs
+                    windows = data[:count.value] if actual_format.value == 32 else []
+                finally:
+                    x11.XFree(data)
+                # The client list is in mapping order; prefer the newest window
+                for window in reversed(windows):
+                    if libxdo.xdo_get_pid_window(xdo, window) in pids:
+                        return (libxdo.xdo_activate_window(xdo, window) == 0
+                                and libxdo.xdo_wait_for_window_active(xdo, window, 1) == 0)
+                return False
+
+            return _NativeInput(activate, send)
+    except (OSError, AttributeError) as e:
+        logging.debug(f"Native keystroke backend unavailable: {e}")
+    return None
+
+@dataclass(slots=True)
+class RunningApp:
+    process: Any  # asyncio subprocess for managed launches, None for detected ones
+    pid: int
+    start_time: float
+    arguments: List[str] = field(default_factory=list)
+    managed: bool = True
 
 class ApplicationManager:
+    # Alternative names users say for configured applications
+    APP_ALIASES = {
+        'browser': 'chrome',
+        'code': 'vscode',
+        'editor': 'vscode',
+        'spreadsheet': 'excel',
+        'document': 'word'
+    }
+
+    # Process names containing any of these are treated as system processes
+    _SYSTEM_PROCESS_RE = re.compile(
+        'system|kernel|launchd|init|svchost|services|runtime|coreservices|background',
+        re.IGNORECASE
+    )
+
+    # Application commands -> shortcut key (Cmd+key on macOS, Ctrl+key on Windows/Linux)
+    _COMMAND_KEYS = {
+        'save': 's',
+        'new': 'n',
+        'close_tab': 'w'
+    }
+
+    # Single-line AppleScript templates for the osascript REPL
+    _ACTIVATE_TEMPLATE = 'tell application "%s" to activate'
+    _KEYSTROKE_TEMPLATE = 'tell application "System Events" to tell process "%s" to keystroke "%s" using {%s}'
+
     def __init__(self):
         self.running_apps = {}
         self.applications_config = {}
+        self._process_name_index = {}
+        self._procname_to_appid = {}
+        # Memoized _resolve_app_id; lru_cache keeps its table consistent when
+        # scans call it from worker threads
+        self._match_app_id = functools.lru_cache(maxsize=PROCESS_NAME_MEMO_SIZE)(self._resolve_app_id)
+        self._process_name_re = None
+        self._config_index = {}
+        self._name_index = {}  # lowercased process name -> [(pid, create_time)]
+        self._name_index_complete = False
+        self._osascript = None
+        self._osascript_lock = asyncio.Lock()
+        self._running_cache = None  # (expires, applications)
         self.is_initialized = False
 
+        # Platform handlers, resolved once instead of branching per call
+        self._switch_dispatch = {
+            'Darwin': self._switch_to_application_macos,
+            'Windows': self._switch_to_application_windows,
+            'Linux': self._switch_to_application_linux
+        }
+        if _SYSTEM == "Darwin":
+            self._send_shortcut = functools.partial(self._send_key_combination_macos, command=True)
+        else:
+            self._send_shortcut = functools.partial(self._send_key_combination_generic, control=True)
+
     async def initialize(self):
         """Initialize application manager"""
         try:
             await self._load_applications_config()
-            await self._scan_running_applications()
+            # Only presence matters at startup, so stop once every app has been seen
+            await self._scan_running_applications(self._iter_processes(), stop_when_complete=True)
+            if _SYSTEM == "Darwin":
+                await self._start_osascript_repl()
             self.is_initialized = True
             logging.info("Application Manager initialized successfully")
         except Exception as e:
@@ -28,9 +399,10 @@ class ApplicationManager:
     async def cleanup(self):
         """Cleanup resources"""
         self.running_apps.clear()
+        await self._stop_osascript_repl()
 
-    async def launch_application(self, app_name: str, arguments: List[str] = None) -> bool:
-        """Launch an application by name"""
+    async def launch_application(self, app_name: str, arguments: List[str] = None, capture_output: bool = False) -> bool:
+        """Launch an application by name (output is discarded unless capture_output is set)"""
         try:
             app_config = self._get_application_config(app_name)
             if not app_config:
@@ -42,22 +414,30 @@ class ApplicationManager:
             if arguments:
                 command.extend(arguments)
 
-            # Launch application
+            # Launch application; GUI apps' output is normally unread, so let the kernel drop it
+            output = asyncio.subprocess.PIPE if capture_output else asyncio.subprocess.DEVNULL
             process = await asyncio.create_subprocess_exec(
                 *command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+                stdout=output,
+                stderr=output,
                 stdin=asyncio.subprocess.DEVNULL
             )
 
-            # Store process info
-            self.running_apps[app_name] = {
-                'process': process,
-                'pid': process.pid,
-                'start_time': asyncio.get_event_loop().time(),
-                'arguments': arguments or []
-            }
+            # Store process info; the creation time tells this process apart
+            # from a later one that reuses its PID
+            create_time = _process_create_time(process.pid)
+            if create_time is not None:
+                self._name_index.setdefault(app_config['process_name'].lower(), []).append(
+                    (process.pid, create_time)
+                )
+            self.running_apps[app_name] = RunningApp(
+                process=process,
+                pid=process.pid,
+                start_time=time.monotonic(),
+                arguments=arguments or []
+            )
 
+            self._running_cache = None
             logging.info(f"Application '{app_name}' launched with PID {process.pid}")
             return True
 
@@ -69,11 +449,15 @@ class ApplicationManager:
         """Close an application by name"""
         try:
             app_info = self.running_apps.get(app_name)
-            if not app_info:
-                # Try to find by process name
-                return await self._close_application_by_process_name(app_name, force)
-
-            process = app_info['process']
+            if not app_info or not app_info.managed:
+                # Not launched by us: find it by process name
+                self.running_apps.pop(app_name, None)
+                closed = await self._close_application_by_process_name(app_name, force)
+                if closed:
+                    self._running_cache = None
+                return closed
+
+            process = app_info.process
             
             if force:
                 process.terminate()
@@ -87,8 +471,10 @@ class ApplicationManager:
                     process.kill()
                     await process.wait()
 
-            # Remove from running apps
+            # Remove from running apps and the PID index
             self.running_apps.pop(app_name, None)
+            self._unindex_pid(app_name, app_info.pid)
+            self._running_cache = None
             logging.info(f"Application '{app_name}' closed")
             return True
 
@@ -96,8 +482,16 @@ class ApplicationManager:
             logging.error(f"Failed to close application '{app_name}': {e}")
             return False
 
+    async def close_many(self, app_names: List[str], force: bool = False) -> List[bool]:
+        """Close several applications concurrently, so graceful-shutdown waits overlap"""
+        return await asyncio.gather(*(self.close_application(name, force) for name in app_names))
+
     async def get_running_applications(self) -> List[Dict[str, Any]]:
-        """Get list of running applications"""
+        """Get list of running applications (cached briefly to absorb UI polling)"""
+        now = time.monotonic()
+        if self._running_cache and now < self._running_cache[0]:
+            return [dict(app) for app in self._running_cache[1]]
+
         try:
             running_apps = []
             
@@ -105,36 +499,33 @@ class ApplicationManager:
             for app_name, app_info in self.running_apps.items():
                 running_apps.append({
                     'name': app_name,
-                    'pid': app_info['pid'],
+                    'pid': app_info.pid,
                     'status': 'running',
                     'managed': True,
-                    'start_time': app_info['start_time']
+                    'start_time': app_info.start_time
                 })
 
             # Add system-detected applications
             system_apps = await self._get_system_running_applications()
             running_apps.extend(system_apps)
 
-            return running_apps
+            self._running_cache = (now + RUNNING_APPS_CACHE_TTL, running_apps)
+            # Callers get their own copies, so they cannot alter the cached list
+            return [dict(app) for app in running_apps]
 
         except Exception as e:
             logging.error(f"Failed to get running applications: {e}")
+            self._running_cache = (now + RUNNING_APPS_FAILURE_TTL, [])
             return []
 
     async def switch_to_application(self, app_name: str) -> bool:
         """Switch focus to an application (platform-specific)"""
         try:
-            system = platform.system()
-            
-            if system == "Darwin":  # macOS
-                return await self._switch_to_application_macos(app_name)
-            elif system == "Windows":
-                return await self._switch_to_application_windows(app_name)
-            elif system == "Linux":
-                return await self._switch_to_application_linux(app_name)
-            else:
-                logging.warning(f"Application switching not supported on {system}")
+            handler = self._switch_dispatch.get(_SYSTEM)
+            if handler is None:
+                logging.warning(f"Application switching not supported on {_SYSTEM}")
                 return False
+            return await handler(app_name)
 
         except Exception as e:
             logging.error(f"Failed to switch to application '{app_name}': {e}")
@@ -147,16 +538,12 @@ class ApplicationManager:
             if not app_config:
                 return False
 
-            # Map common commands to platform-specific actions
-            if command == "save":
-                return await self._send_save_command(app_name)
-            elif command == "new":
-                return await self._send_new_command(app_name)
-            elif command == "close_tab":
-                return await self._send_close_tab_command(app_name)
-            else:
+            # Map common commands straight to the platform's shortcut sender
+            key = self._COMMAND_KEYS.get(command)
+            if key is None:
                 logging.warning(f"Unknown application command: {command}")
                 return False
+            return await self._send_shortcut(app_name, key)
 
         except Exception as e:
             logging.error(f"Failed to execute command '{command}' for '{app_name}': {e}")
@@ -179,7 +566,14 @@ class ApplicationManager:
         }
 
         if is_running:
-            app_info.update(self.running_apps[app_name])
+            running = self.running_apps[app_name]
+            app_info.update(
+                process=running.process,
+                pid=running.pid,
+                start_time=running.start_time,
+                arguments=running.arguments,
+                managed=running.managed
+            )
 
         return app_info
 
@@ -230,46 +624,111 @@ class ApplicationManager:
             }
         }
 
-    async def _scan_running_applications(self):
-        """Scan for currently running applications"""
-        for proc in psutil.process_iter(['name', 'pid']):
-            try:
-                proc_name = proc.info['name'].lower()
-                
-                # Match against configured applications
-                for app_id, app_config in self.applications_config.items():
-                    if app_config['process_name'].lower() in proc_name:
-                        self.running_apps[app_id] = {
-                            'pid': proc.info['pid'],
-                            'process': proc,
-                            'start_time': proc.create_time(),
-                            'managed': False
-                        }
-                        break
-                        
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+        # Config lookup by app id or alias, exact and lowercased
+        self._config_index = {}
+        for alias, app_id in self.APP_ALIASES.items():
+            if app_id in self.applications_config:
+                self._config_index[alias] = self.applications_config[app_id]
+        for app_id, app_config in self.applications_config.items():
+            self._config_index[app_id.lower()] = app_config
+            self._config_index[app_id] = app_config
+
+        # Lowercased process name per app, plus an exact-name lookup; other
+        # names resolve by substring match (e.g. "google chrome helper")
+        self._process_name_index = {
+            app_id: app_config['process_name'].lower()
+            for app_id, app_config in self.applications_config.items()
+        }
+        self._procname_to_appid = {name: app_id for app_id, name in self._process_name_index.items()}
+        self._process_name_re = re.compile(
+            '|'.join(re.escape(name) for name in self._procname_to_appid) or '(?!)'
+        )
+        self._match_app_id.cache_clear()
+
+    async def _scan_running_applications(self, snapshot=None, stop_when_complete: bool = False):
+        """Scan for currently running applications
+
+        With stop_when_complete the scan ends as soon as every configured
+        application has been matched; the PID index is then partial and is
+        rebuilt by a full scan before it is used for closing.
+        """
+        # Process enumeration blocks on procfs/psutil, so run it off the event loop
+        detected, name_index, complete = await asyncio.to_thread(
+            self._scan_sync, snapshot, stop_when_complete
+        )
+        # Managed launches keep their process handle; detected entries are
+        # replaced by this scan, dropping apps that have since exited, and
+        # managed ones go once their process has been reaped
+        for app_name, app_info in list(self.running_apps.items()):
+            if app_info.managed:
+                if app_info.process.returncode is not None:
+                    del self.running_apps[app_name]
+            elif app_name not in detected:
+                del self.running_apps[app_name]
+        for app_id, app_info in detected.items():
+            current = self.running_apps.get(app_id)
+            if current is None or not current.managed:
+                self.running_apps[app_id] = app_info
+        self._name_index = name_index
+        self._name_index_complete = complete
+
+    def _scan_sync(self, snapshot=None, stop_when_complete: bool = False):
+        """Match processes against configured apps; returns (detected, name_index, complete)"""
+        if snapshot is None:
+            snapshot = self._iter_processes()
+
+        detected = {}
+        name_index = {}
+        matched = set()
+        target = len(self._process_name_index)
+        complete = True
+        match_app_id = self._match_app_id
+        for _, proc_name, pid, create_time in snapshot:
+            app_id = match_app_id(proc_name.lower())
+
+            if app_id is not None:
+                name_index.setdefault(self._process_name_index[app_id], []).append((pid, create_time))
+                # Keep only the PID; a psutil.Process pins handles and cached state
+                detected[app_id] = RunningApp(
+                    process=None,
+                    pid=pid,
+                    start_time=create_time,
+                    managed=False
+                )
+                matched.add(app_id)
+
+            if stop_when_complete and len(matched) >= target:
+                complete = False
+                break
+
+        return detected, name_index, complete
+
+    def _resolve_app_id(self, proc_name: str) -> Optional[str]:
+        """Configured app id for a lowercased process name, or None (memoized as _match_app_id)"""
+        app_id = self._procname_to_appid.get(proc_name)
+        if app_id is None:
+            # Unknown names fall back to one regex search
+            match = self._process_name_re.search(proc_name)
+            app_id = self._procname_to_appid[match.group()] if match else None
+        return app_id
+
+    def _iter_processes(self):
+        """Lazily yield system processes as (process, name, pid, create_time) tuples"""
+        if _SYSTEM == 'Linux':
+            for proc in _iter_procs_linux():
+                if proc[1]:
+                    yield proc
+            return
+
+        # process_iter fetches the requested attributes in a single oneshot() per process
+        for proc in psutil.process_iter(['name', 'pid', 'create_time']):
+            info = proc.info
+            if info['name']:
+                yield proc, sys.intern(info['name']), info['pid'], info['create_time']
 
     def _get_application_config(self, app_name: str) -> Optional[Dict[str, Any]]:
         """Get application configuration by name or alias"""
-        # Direct match
-        if app_name in self.applications_config:
-            return self.applications_config[app_name]
-        
-        # Alias match
-        app_aliases = {
-            'browser': 'chrome',
-            'code': 'vscode',
-            'editor': 'vscode',
-            'spreadsheet': 'excel',
-            'document': 'word'
-        }
-        
-        aliased_name = app_aliases.get(app_name.lower())
-        if aliased_name and aliased_name in self.applications_config:
-            return self.applications_config[aliased_name]
-        
-        return None
+        return self._config_index.get(app_name) or self._config_index.get(app_name.lower())
 
     async def _close_application_by_process_name(self, app_name: str, force: bool) -> bool:
         """Close application by process name"""
@@ -277,51 +736,75 @@ class ApplicationManager:
         if not app_config:
             return False
 
-        process_name = app_config['process_name']
-        closed_count = 0
+        process_name = app_config['process_name'].lower()
+        sig = _FORCE_KILL_SIGNAL if force else signal.SIGTERM
+
+        if not self._name_index_complete:
+            # Startup scan stopped early and may have missed some of this app's PIDs
+            await self._scan_running_applications()
 
-        for proc in psutil.process_iter(['name', 'pid']):
+        closed_count = self._signal_pids(self._name_index.pop(process_name, ()), sig)
+        if not closed_count:
+            # Indexed PIDs are gone or were never seen: refresh from a new snapshot
+            await self._scan_running_applications()
+            closed_count = self._signal_pids(self._name_index.pop(process_name, ()), sig)
+
+        return closed_count > 0
+
+    def _signal_pids(self, entries, sig) -> int:
+        """Signal each indexed (pid, create_time), returning how many were signalled
+
+        A PID whose creation time no longer matches has exited and been reused
+        by an unrelated process, so it is skipped.
+        """
+        signalled = 0
+        for pid, create_time in entries:
+            if _process_create_time(pid) != create_time:
+                continue
             try:
-                if proc.info['name'] and process_name.lower() in proc.info['name'].lower():
-                    if force:
-                        proc.kill()
-                    else:
-                        proc.terminate()
-                    closed_count += 1
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                os.kill(pid, sig)
+                signalled += 1
+            except (ProcessLookupError, PermissionError):
                 continue
+        return signalled
 
-        return closed_count > 0
+    def _unindex_pid(self, app_name: str, pid: int):
+        """Drop a closed PID from the process name index"""
+        app_config = self._get_application_config(app_name)
+        if not app_config:
+            return
+        entries = self._name_index.get(app_config['process_name'].lower())
+        if entries:
+            entries[:] = [entry for entry in entries if entry[0] != pid]
 
-    async def _get_system_running_applications(self) -> List[Dict[str, Any]]:
+    async def _get_system_running_applications(self, snapshot: List[tuple] = None) -> List[Dict[str, Any]]:
         """Get applications running on the system"""
+        return await asyncio.to_thread(self._list_user_applications, snapshot)
+
+    def _list_user_applications(self, snapshot: List[tuple] = None) -> List[Dict[str, Any]]:
+        """Blocking half of _get_system_running_applications"""
+        if snapshot is None:
+            snapshot = self._iter_processes()
+
         system_apps = []
-        
-        for proc in psutil.process_iter(['name', 'pid', 'create_time']):
-            try:
-                # Filter out system processes
-                if self._is_user_application(proc.info['name']):
-                    system_apps.append({
-                        'name': proc.info['name'],
-                        'pid': proc.info['pid'],
-                        'status': 'running',
-                        'managed': False,
-                        'start_time': proc.info['create_time']
-                    })
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+        for _, proc_name, pid, create_time in snapshot:
+            # Filter out system processes
+            if self._is_user_application(proc_name):
+                system_apps.append({
+                    'name': proc_name,
+                    'pid': pid,
+                    'status': 'running',
+                    'managed': False,
+                    'start_time': create_time
+                })
 
         return system_apps
 
-    def _is_user_application(self, process_name: str) -> bool:
+    @staticmethod
+    @functools.lru_cache(maxsize=PROCESS_NAME_MEMO_SIZE)
+    def _is_user_application(process_name: str) -> bool:
         """Check if a process is a user application"""
-        system_processes = {
-            'system', 'kernel', 'launchd', 'init', 'svchost', 'services',
-            'runtime', 'coreservices', 'background'
-        }
-        
-        process_lower = process_name.lower()
-        return not any(sys_proc in process_lower for sys_proc in system_processes)
+        return ApplicationManager._SYSTEM_PROCESS_RE.search(process_name) is None
 
     # Platform-specific application switching
     async def _switch_to_application_macos(self, app_name: str) -> bool:
@@ -332,20 +815,7 @@ class ApplicationManager:
                 return False
 
             # Use AppleScript to activate application
-            script = f'''
-            tell application "{app_config['name']}"
-                activate
-            end tell
-            '''
-            
-            process = await asyncio.create_subprocess_exec(
-                'osascript', '-e', script,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            await process.wait()
-            return process.returncode == 0
+            return await self._run_applescript(self._ACTIVATE_TEMPLATE % app_config['name'])
             
         except Exception as e:
             logging.error(f"macOS application switching failed: {e}")
@@ -354,10 +824,7 @@ class ApplicationManager:
     async def _switch_to_application_windows(self, app_name: str) -> bool:
         """Switch to application on Windows"""
         try:
-            # This would use Windows API calls
-            # For now, return mock implementation
-            logging.info(f"Windows application switching for {app_name}")
-            return True
+            return await self._activate_native_window(app_name)
         except Exception as e:
             logging.error(f"Windows application switching failed: {e}")
             return False
@@ -365,48 +832,25 @@ class ApplicationManager:
     async def _switch_to_application_linux(self, app_name: str) -> bool:
         """Switch to application on Linux"""
         try:
-            # This would use wmctrl or similar tools
-            # For now, return mock implementation
-            logging.info(f"Linux application switching for {app_name}")
-            return True
+            return await self._activate_native_window(app_name)
         except Exception as e:
             logging.error(f"Linux application switching failed: {e}")
             return False
 
-    # Application command implementations
-    async def _send_save_command(self, app_name: str) -> bool:
-        """Send save command to application"""
-        system = platform.system()
-        
-        if system == "Darwin":
-            # macOS: Cmd+S
-            return await self._send_key_combination_macos(app_name, 's', command=True)
-        else:
-            # Windows/Linux: Ctrl+S
-            return await self._send_key_combination_generic(app_name, 's', control=True)
-
-    async def _send_new_command(self, app_name: str) -> bool:
-        """Send new file/document command to application"""
-        system = platform.system()
-        
-        if system == "Darwin":
-            # macOS: Cmd+N
-            return await self._send_key_combination_macos(app_name, 'n', command=True)
-        else:
-            # Windows/Linux: Ctrl+N
-            return await self._send_key_combination_generic(app_name, 'n', control=True)
-
-    async def _send_close_tab_command(self, app_name: str) -> bool:
-        """Send close tab command to application"""
-        system = platform.system()
-        
-        if system == "Darwin":
-            # macOS: Cmd+W
-            return await self._send_key_combination_macos(app_name, 'w', command=True)
-        else:
-            # Windows/Linux: Ctrl+W
-            return await self._send_key_combination_generic(app_name, 'w', control=True)
+    async def _activate_native_window(self, app_name: str) -> bool:
+        """Raise and focus a window of the application through user32/libxdo"""
+        native_input = _load_native_input()
+        if native_input is None:
+            # No native library: switching is not available, as before
+            logging.info(f"Application switching for {app_name} (no native window API)")
+            return True
+        pids = await self._application_pids(app_name)
+        if not pids or not native_input.activate(pids):
+            logging.warning(f"Could not focus a window of {app_name}")
+            return False
+        return True
 
+    # Application command implementations
     async def _send_key_combination_macos(self, app_name: str, key: str, command: bool = False) -> bool:
         """Send key combination on macOS"""
         try:
@@ -415,90 +859,140 @@ class ApplicationManager:
                 return False
 
             modifier = "command down" if command else ""
-            script = f'''
-            tell application "System Events"
-                tell process "{app_config['process_name']}"
-                    keystroke "{key}" using {{{modifier}}}
-                end tell
-            end tell
-            '''
-            
-            process = await asyncio.create_subprocess_exec(
-                'osascript', '-e', script,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            await process.wait()
-            return process.returncode == 0
+            script = self._KEYSTROKE_TEMPLATE % (app_config['process_name'], key, modifier)
+            return await self._run_applescript(script)
             
         except Exception as e:
             logging.error(f"macOS key combination failed: {e}")
             return False
 
+    async def _start_osascript_repl(self):
+        """Start a long-lived interactive osascript so commands skip fork/exec"""
+        try:
+            self._osascript = await asyncio.create_subprocess_exec(
+                'osascript', '-i',
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+        except Exception as e:
+            logging.warning(f"Persistent osascript unavailable, using one-shot calls: {e}")
+            self._osascript = None
+
+    async def _stop_osascript_repl(self):
+        """Shut down the interactive osascript process"""
+        if not self._osascript:
+            return
+        try:
+            self._osascript.stdin.close()
+            await asyncio.wait_for(self._osascript.wait(), timeout=2)
+        except Exception:
+            self._kill_osascript_repl()
+        self._osascript = None
+
+    def _kill_osascript_repl(self):
+        try:
+            self._osascript.kill()
+        except ProcessLookupError:
+            pass
+
+    async def _run_applescript(self, script: str) -> bool:
+        """Run a single-line AppleScript statement, preferring the persistent REPL"""
+        async with self._osascript_lock:
+            if self._osascript and self._osascript.returncode is not None:
+                # The REPL exited between commands; start a fresh one
+                await self._start_osascript_repl()
+            repl = self._osascript
+            if repl:
+                try:
+                    repl.stdin.write((_OSASCRIPT_WRAPPER % script).encode())
+                    await repl.stdin.drain()
+                    while True:
+                        line = await asyncio.wait_for(repl.stdout.readline(), timeout=5)
+                        if not line:
+                            break
+                        if _OSASCRIPT_OK in line:
+                            return True
+                        if _OSASCRIPT_ERROR in line:
+                            logging.warning(f"AppleScript failed: {line.decode(errors='replace').strip()}")
+                            return False
+                except (asyncio.TimeoutError, ConnectionError):
+                    pass
+                # The script may already have run, so it is not retried;
+                # replace the REPL for the next command
+                logging.warning("Persistent osascript stopped responding; command outcome unknown")
+                self._kill_osascript_repl()
+                await repl.wait()
+                await self._start_osascript_repl()
+                return False
+
+        process = await asyncio.create_subprocess_exec(
+            'osascript', '-e', script,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        await process.wait()
+        return process.returncode == 0
+
     async def _send_key_combination_generic(self, app_name: str, key: str, control: bool = False) -> bool:
-        """Send key combination on Windows/Linux"""
-        # This would use platform-specific automation libraries
-        logging.info(f"Sending key combination to {app_name}: {'Ctrl+' if control else ''}{key}")
-        return True
+        """Send key combination on Windows/Linux to the application's window"""
+        # None on macOS (AppleScript is used there) or when the native library is missing
+        native_input = _load_native_input()
+        if native_input is None:
+            logging.info(f"Sending key combination to {app_name}: {'Ctrl+' if control else ''}{key}")
+            return True
+        try:
+            # Keystrokes go to the focused window: bring the app forward, and
+            # refuse to type if the focused window still belongs to another process
+            if not await self.switch_to_application(app_name):
+                return False
+            pids = await self._application_pids(app_name)
+            if not pids or not native_input.send(key, control, pids):
+                logging.warning(f"Not sending key combination: {app_name} does not own the focused window")
+                return False
+            return True
+        except Exception as e:
+            logging.error(f"Error sending key combination to {app_name}: {e}")
+            return False
+
+    async def _application_pids(self, app_name: str) -> set:
+        """Live PIDs of an application, from its managed launch and the name index"""
+        app_config = self._get_application_config(app_name)
+        if not app_config:
+            return set()
+        process_name = app_config['process_name'].lower()
+        if not self._name_index_complete or not self._name_index.get(process_name):
+            await self._scan_running_applications()
+        pids = {
+            pid for pid, create_time in self._name_index.get(process_name, ())
+            if _process_create_time(pid) == create_time
+        }
+        app_info = self.running_apps.get(app_name)
+        if app_info and app_info.managed:
+            pids.add(app_info.pid)
+        return pids
 
     # Application path detection
     def _get_chrome_path(self) -> str:
         """Get Chrome executable path"""
-        system = platform.system()
-        if system == "Darwin":
-            return "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
-        elif system == "Windows":
-            return "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
-        else:
-            return "/usr/bin/google-chrome"
+        return _APP_PATHS['chrome']
 
     def _get_vscode_path(self) -> str:
         """Get VS Code executable path"""
-        system = platform.system()
-        if system == "Darwin":
-            return "/Applications/Visual Studio Code.app/Contents/MacOS/Electron"
-        elif system == "Windows":
-            return "C:\\Users\\{}\\AppData\\Local\\Programs\\Microsoft VS Code\\Code.exe"
-        else:
-            return "/usr/bin/code"
+        return _APP_PATHS['vscode']
 
     def _get_slack_path(self) -> str:
         """Get Slack executable path"""
-        system = platform.system()
-        if system == "Darwin":
-            return "/Applications/Slack.app/Contents/MacOS/Slack"
-        elif system == "Windows":
-            return "C:\\Users\\{}\\AppData\\Local\\slack\\slack.exe"
-        else:
-            return "/usr/bin/slack"
+        return _APP_PATHS['slack']
 
     def _get_photoshop_path(self) -> str:
         """Get Photoshop executable path"""
-        system = platform.system()
-        if system == "Darwin":
-            return "/Applications/Adobe Photoshop 2023/Adobe Photoshop 2023.app/Contents/MacOS/Adobe Photoshop 2023"
-        elif system == "Windows":
-            return "C:\\Program Files\\Adobe\\Adobe Photoshop 2023\\Photoshop.exe"
-        else:
-            return ""
+        return _APP_PATHS['photoshop']
 
     def _get_excel_path(self) -> str:
         """Get Excel executable path"""
-        system = platform.system()
-        if system == "Darwin":
-            return "/Applications/Microsoft Excel.app/Contents/MacOS/Microsoft Excel"
-        elif system == "Windows":
-            return "C:\\Program Files\\Microsoft Office\\root\\Office16\\EXCEL.EXE"
-        else:
-            return ""
+        return _APP_PATHS['excel']
 
     def _get_word_path(self) -> str:
         """Get Word executable path"""
-        system = platform.system()
-        if system == "Darwin":
-            return "/Applications/Microsoft Word.app/Contents/MacOS/Microsoft Word"
-        elif system == "Windows":
-            return "C:\\Program Files\\Microsoft Office\\root\\Office16\\WINWORD.EXE"
-        else:
-            return ""
+        return _APP_PATHS['word']
@@ -3,13 +3,240 @@ import asyncio
 import subprocess
 import shutil
 import logging
+import os
+import platform
+import psutil
+import re
+import shlex
+import signal
+import time
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+# Command prefixes dispatched before any keyword matching
+_LAUNCH_PREFIXES = ('open ', 'launch ', 'start ')
+_CLOSE_PREFIXES = ('close ', 'quit ', 'exit ')
+
+# Dispatch keywords -> handler rank; the lowest rank found wins, which keeps
+# the original search > file operation > system info precedence
+_COMMAND_KEYWORDS = {
+    'search': 0, 'find': 0, 'locate': 0,
+    'copy': 1, 'move': 1, 'delete': 1, 'backup': 1,
+    'what time': 2, 'what date': 2
+}
+
+# Find every keyword in one pass over the command; fall back to a regex
+# alternation when pyahocorasick is not installed
+try:
+    import ahocorasick
+    _command_keyword_automaton = ahocorasick.Automaton()
+    for _keyword, _rank in _COMMAND_KEYWORDS.items():
+        _command_keyword_automaton.add_word(_keyword, _rank)
+    _command_keyword_automaton.make_automaton()
+    _command_keyword_regex = None
+except ImportError:
+    _command_keyword_automaton = None
+    _command_keyword_regex = re.compile('|'.join(map(re.escape, _COMMAND_KEYWORDS)))
+
+# Argument extraction: "<verb> [the|my] <app>" and "<search verb> <query>"
+_APP_NAME_RE = re.compile(
+    '(?:%s)' % '|'.join(map(re.escape, _LAUNCH_PREFIXES + _CLOSE_PREFIXES)) + r'(.*?)[\s.,!?]*$'
+)
+_APP_FILLER_WORDS = frozenset(('the', 'my', 'a', 'an', 'please'))
+_SEARCH_QUERY_RE = re.compile(r'(?:search for|find|locate|look for) (.*)')
+_SEARCH_NOISE_RE = re.compile(r' files| documents')
+_SEARCH_STOP_WORDS = frozenset(('for', 'my', 'the'))
+
+# File operations in precedence order, and each trigger word's index into it.
+# "save copy" needs no entry for backup: it always contains "copy", which wins.
+_FILE_OPERATIONS = ('copy', 'move', 'delete', 'backup')
+_FILE_OPERATION_WORDS = {
+    'copy': 0, 'duplicate': 0,
+    'move': 1, 'transfer': 1,
+    'delete': 2, 'remove': 2, 'trash': 2,
+    'backup': 3
+}
+_FILE_OPERATION_RE = re.compile('|'.join(map(re.escape, _FILE_OPERATION_WORDS)))
+
+def _keyword_rank(command: str) -> Optional[int]:
+    """Return the best handler rank for the keywords in command, or None"""
+    if _command_keyword_automaton is not None:
+        ranks = (rank for _, rank in _command_keyword_automaton.iter(command))
+    else:
+        ranks = (_COMMAND_KEYWORDS[keyword] for keyword in _command_keyword_regex.findall(command))
+    return min(ranks, default=None)
+
+# Commands are re-issued with the same phrasing constantly, so routing and
+# argument extraction (both pure functions of the text) are memoized
+@lru_cache(maxsize=4096)
+def _classify(command: str) -> Optional[int]:
+    """Return the index of the handler for a normalized command, or None for execute_io"""
+    if command.startswith(_LAUNCH_PREFIXES):
+        return 0
+    if command.startswith(_CLOSE_PREFIXES):
+        return 1
+    rank = _keyword_rank(command)
+    return None if rank is None else rank + 2
+
+# Formatted time/date answers, refreshed at most once per wall-clock second
+_clock_cache = {'second': None, 'time': '', 'date': ''}
+
+def _clock_strings() -> Dict[str, Any]:
+    now = time.time()
+    second = int(now)
+    if second != _clock_cache['second']:
+        current = datetime.fromtimestamp(now)
+        _clock_cache['time'] = current.strftime("%I:%M %p")
+        _clock_cache['date'] = current.strftime("%A, %B %d, %Y")
+        _clock_cache['second'] = second
+    return _clock_cache
+
+# Host facts that cannot change while the process runs; platform.processor()
+# and friends may shell out or parse files, so they are read only once
+@lru_cache(maxsize=None)
+def _static_system_info() -> Dict[str, Any]:
+    return {
+        'platform': platform.platform(),
+        'system': platform.system(),
+        'release': platform.release(),
+        'architecture': platform.architecture()[0],
+        'processor': platform.processor(),
+        'user': platform.node(),
+        'boot_time': psutil.boot_time()
+    }
+
+# Generic commands run in a few long-lived shells instead of spawning one per call
+_PERSISTENT_SHELL = os.name == 'posix'
+# Sized like ThreadPoolExecutor: commands mostly wait on I/O, so allow more than one per core
+_SHELL_POOL_SIZE = min(32, (os.cpu_count() or 1) + 4)
+
+# Longest a pooled command may run before its worker is killed and replaced
+_SHELL_COMMAND_TIMEOUT = 30.0
+
+# Marker the worker shell prints after each command (followed by its exit status on stdout)
+_SHELL_DONE = "__kruboo_shell_done__"
+_SHELL_DONE_BYTES = _SHELL_DONE.encode()
+
+# Per-stream cap on captured command output; larger output aborts the command
+_SHELL_OUTPUT_LIMIT = 1 << 20
+_SHELL_READ_SIZE = 64 * 1024
+
+def _output_limit_exceeded() -> RuntimeError:
+    return RuntimeError(f"Command output exceeded {_SHELL_OUTPUT_LIMIT} bytes")
+
+async def _read_capped(stream: asyncio.StreamReader) -> bytes:
+    """Read a stream to EOF, raising once it exceeds _SHELL_OUTPUT_LIMIT"""
+    output = bytearray()
+    while True:
+        chunk = await stream.read(_SHELL_READ_SIZE)
+        if not chunk:
+            return bytes(output)
+        output += chunk
+        if len(output) > _SHELL_OUTPUT_LIMIT:
+            raise _output_limit_exceeded()
+
+async def _gather_or_cancel(*aws) -> list:
+    """gather(), except that the first failure cancels the other awaitables
+
+    Used for a command's stdout/stderr readers: once one stream exceeds the
+    output cap the other must stop reading too, instead of draining the pipe.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+class _ShellWorker:
+    """A persistent /bin/sh that runs one command at a time"""
+
+    __slots__ = ('process',)
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+
+    @classmethod
+    async def start(cls) -> '_ShellWorker':
+        process = await asyncio.create_subprocess_exec(
+            '/bin/sh',
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=_SHELL_OUTPUT_LIMIT,
+            # Own process group, so close() also kills a command still running
+            start_new_session=True
+        )
+        return cls(process)
+
+    async def run(self, command: str) -> tuple:
+        """Run command, returning (returncode, stdout, stderr)"""
+        # eval inside a subshell so syntax errors, cd and exports cannot leak
+        # into the worker, and stdin is closed so the command can't eat the script
+        script = (
+            f"( eval {shlex.quote(command)} ) </dev/null; "
+            f"printf '\\n{_SHELL_DONE} %d\\n' $?; "
+            f"printf '\\n{_SHELL_DONE}\\n' >&2\n"
+        )
+        self.process.stdin.write(script.encode())
+        await self.process.stdin.drain()
+
+        (stdout, status), (stderr, _) = await _gather_or_cancel(
+            self._read_until_done(self.process.stdout),
+            self._read_until_done(self.process.stderr)
+        )
+        return int(status), stdout, stderr
+
+    @staticmethod
+    async def _read_until_done(stream: asyncio.StreamReader) -> tuple:
+        output = bytearray()
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                # A single line longer than the stream limit
+                raise _output_limit_exceeded()
+            if not line:
+                raise ConnectionError("Shell worker exited unexpectedly")
+            if line.startswith(_SHELL_DONE_BYTES):
+                return bytes(output), line[len(_SHELL_DONE_BYTES):].strip()
+            output += line
+            if len(output) > _SHELL_OUTPUT_LIMIT:
+                raise _output_limit_exceeded()
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    async def close(self):
+        """Kill the shell and anything it is running, then reap it"""
+        if self.alive:
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        await self.process.wait()
+
 class CommandProcessor:
+    __slots__ = ('command_registry', 'is_initialized', '_idle_shells', '_shell_slots', '_handlers')
+
     def __init__(self):
         self.command_registry = {}
         self.is_initialized = False
+        self._idle_shells = []
+        self._shell_slots = asyncio.Semaphore(_SHELL_POOL_SIZE)
+
+        # In-process handlers indexed by _classify()
+        self._handlers = (
+            self._handle_application_launch,
+            self._handle_application_close,
+            self._handle_file_search,
+            self._handle_file_operation,
+            self._handle_system_info
+        )
 
     async def initialize(self):
         """Initialize command processor"""
@@ -24,56 +251,60 @@ class CommandProcessor:
     async def cleanup(self):
         """Cleanup resources"""
         self.command_registry.clear()
+        idle_shells, self._idle_shells = self._idle_shells, []
+        await asyncio.gather(*(worker.close() for worker in idle_shells))
 
     async def execute(self, command: str, parameters: Dict[str, Any] = None) -> Dict[str, Any]:
         """Execute a system command"""
+        result = self.execute_sync(command, parameters)
+        if result is not None:
+            return result
+        return await self.execute_io(command, parameters)
+
+    def execute_sync(self, command: str, parameters: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """Execute commands handled in-process; returns None if the command needs execute_io"""
+        if not command or command.isspace():
+            # Nothing to route, and never hand an empty string to the shell
+            return {
+                'success': False,
+                'response': "Empty command",
+                'confidence': 0.0,
+                'execution_time': 0
+            }
+
         try:
             parameters = parameters or {}
             
             # Parse command and route to appropriate handler
             command_lower = command.lower().strip()
             
-            if command_lower.startswith(('open ', 'launch ', 'start ')):
-                return await self._handle_application_launch(command_lower, parameters)
-            elif command_lower.startswith(('close ', 'quit ', 'exit ')):
-                return await self._handle_application_close(command_lower, parameters)
-            elif any(keyword in command_lower for keyword in ['search', 'find', 'locate']):
-                return await self._handle_file_search(command_lower, parameters)
-            elif any(keyword in command_lower for keyword in ['copy', 'move', 'delete', 'backup']):
-                return await self._handle_file_operation(command_lower, parameters)
-            elif any(keyword in command_lower for keyword in ['what time', 'what date']):
-                return await self._handle_system_info(command_lower, parameters)
-            else:
-                return await self._handle_generic_command(command, parameters)
+            handler = _classify(command_lower)
+            if handler is None:
+                return None
+            return self._handlers[handler](command_lower, parameters)
                 
         except Exception as e:
             logging.error(f"Command execution failed: {e}")
-            return {
-                'success': False,
-                'response': f"Command failed: {str(e)}",
-                'confidence': 0.0,
-                'execution_time': 0
-            }
+            return self._command_failed(e)
+
+    async def execute_io(self, command: str, parameters: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Execute commands that have to run as a subprocess"""
+        try:
+            return await self._handle_generic_command(command, parameters or {})
+        except Exception as e:
+            logging.error(f"Command execution failed: {e}")
+            return self._command_failed(e)
 
     async def get_system_info(self) -> Dict[str, Any]:
         """Get basic system information"""
         try:
-            import platform
-            import psutil
-            
-            boot_time = psutil.boot_time()
-            uptime = datetime.now().timestamp() - boot_time
-            
+            static_info = _static_system_info()
+            now = datetime.now()
+
             return {
-                'platform': platform.platform(),
-                'system': platform.system(),
-                'release': platform.release(),
-                'architecture': platform.architecture()[0],
-                'processor': platform.processor(),
-                'boot_time': boot_time,
-                'uptime': uptime,
-                'current_time': datetime.now().isoformat(),
-                'user': platform.node()
+                **static_info,
+                'uptime': now.timestamp() - static_info['boot_time'],
+                'current_time': now.isoformat()
             }
             
         except Exception as e:
@@ -85,7 +316,7 @@ class CommandProcessor:
         return self.is_initialized
 
     # Command handlers
-    async def _handle_application_launch(self, command: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    def _handle_application_launch(self, command: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Handle application launch commands"""
         try:
             # Extract application name from command
@@ -116,7 +347,7 @@ class CommandProcessor:
                 'execution_time': 0
             }
 
-    async def _handle_application_close(self, command: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    def _handle_application_close(self, command: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Handle application close commands"""
         try:
             app_name = self._extract_app_name(command)
@@ -145,7 +376,7 @@ class CommandProcessor:
                 'execution_time': 0
             }
 
-    async def _handle_file_search(self, command: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    def _handle_file_search(self, command: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Handle file search commands"""
         try:
             search_query = self._extract_search_query(command)
@@ -174,7 +405,7 @@ class CommandProcessor:
                 'execution_time': 0
             }
 
-    async def _handle_file_operation(self, command: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    def _handle_file_operation(self, command: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Handle file operations"""
         try:
             operation = self._extract_file_operation(command)
@@ -202,11 +433,11 @@ class CommandProcessor:
                 'execution_time': 0
             }
 
-    async def _handle_system_info(self, command: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    def _handle_system_info(self, command: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Handle system information queries"""
         try:
             if 'time' in command:
-                current_time = datetime.now().strftime("%I:%M %p")
+                current_time = _clock_strings()['time']
                 return {
                     'success': True,
                     'response': f"The current time is {current_time}",
@@ -214,7 +445,7 @@ class CommandProcessor:
                     'execution_time': 0.1
                 }
             elif 'date' in command:
-                current_date = datetime.now().strftime("%A, %B %d, %Y")
+                current_date = _clock_strings()['date']
                 return {
                     'success': True,
                     'response': f"Today is {current_date}",
@@ -241,16 +472,27 @@ class CommandProcessor:
         """Handle generic commands"""
         try:
             # Try to execute as shell command
-            process = await asyncio.create_subprocess_shell(
-                command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode == 0:
-                response = stdout.decode().strip() or "Command executed successfully"
+            if _PERSISTENT_SHELL:
+                returncode, stdout, stderr = await self._run_in_shell(command)
+            else:
+                process = await asyncio.create_subprocess_shell(
+                    command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                try:
+                    stdout, stderr = await _gather_or_cancel(
+                        _read_capped(process.stdout),
+                        _read_capped(process.stderr)
+                    )
+                except BaseException:
+                    process.kill()
+                    await process.wait()
+                    raise
+                returncode = await process.wait()
+
+            if returncode == 0:
+                response = stdout.decode(errors='replace').strip() or "Command executed successfully"
                 return {
                     'success': True,
                     'response': response,
@@ -258,7 +500,7 @@ class CommandProcessor:
                     'execution_time': 0.5
                 }
             else:
-                error_msg = stderr.decode().strip() or "Command failed"
+                error_msg = stderr.decode(errors='replace').strip() or "Command failed"
                 return {
                     'success': False,
                     'response': error_msg,
@@ -275,63 +517,86 @@ class CommandProcessor:
             }
 
     # Helper methods
-    def _extract_app_name(self, command: str) -> Optional[str]:
+    async def _run_in_shell(self, command: str) -> tuple:
+        """Run a command on a pooled worker shell, starting one if none is idle"""
+        async with self._shell_slots:
+            worker = None
+            while self._idle_shells:
+                worker = self._idle_shells.pop()
+                if worker.alive:
+                    break
+                # Died while idle; reap it and try the next one
+                await worker.close()
+                worker = None
+            if worker is None:
+                worker = await _ShellWorker.start()
+            try:
+                result = await asyncio.wait_for(worker.run(command), _SHELL_COMMAND_TIMEOUT)
+            except asyncio.TimeoutError:
+                await worker.close()
+                raise RuntimeError(f"Command timed out after {_SHELL_COMMAND_TIMEOUT:g} seconds") from None
+            except BaseException:
+                # The worker's output position is unknown now, so never reuse it
+                await worker.close()
+                raise
+            self._idle_shells.append(worker)
+            return result
+
+    def _command_failed(self, error: Exception) -> Dict[str, Any]:
+        """Build the result returned when dispatch itself raised"""
+        return {
+            'success': False,
+            'response': f"Command failed: {str(error)}",
+            'confidence': 0.0,
+            'execution_time': 0
+        }
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _extract_app_name(command: str) -> Optional[str]:
         """Extract application name from command"""
-        prefixes = ['open ', 'launch ', 'start ', 'close ', 'quit ', 'exit ']
-        
-        for prefix in prefixes:
-            if command.startswith(prefix):
-                app_name = command[len(prefix):].strip()
-                # Remove any trailing punctuation or common words
-                app_name = app_name.rstrip('.,!?')
-                app_name = app_name.replace(' the ', ' ').replace(' my ', ' ').strip()
-                return app_name if app_name else None
-        
-        return None
+        match = _APP_NAME_RE.match(command)
+        if not match:
+            return None
+
+        # Remove common filler words left inside the name
+        app_name = ' '.join(word for word in match.group(1).split() if word not in _APP_FILLER_WORDS)
+        return app_name if app_name else None
 
-    def _extract_search_query(self, command: str) -> Optional[str]:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _extract_search_query(command: str) -> Optional[str]:
         """Extract search query from command"""
-        prefixes = ['search for ', 'find ', 'locate ', 'look for ']
+        match = _SEARCH_QUERY_RE.match(command)
+        if match:
+            # Remove common trailing phrases
+            query = _SEARCH_NOISE_RE.sub('', match.group(1).strip()).strip()
+            return query if query else None
         
-        for prefix in prefixes:
-            if command.startswith(prefix):
-                query = command[len(prefix):].strip()
-                # Remove common trailing phrases
-                query = query.replace(' files', '').replace(' documents', '').strip()
-                return query if query else None
-        
-        # Fallback: look for "search" or "find" in the command
-        if 'search' in command or 'find' in command:
-            # Extract words after search/find
-            words = command.split()
-            try:
-                search_index = max(command.find('search'), command.find('find'))
-                if search_index != -1:
-                    query_words = []
-                    for word in words[words.index('search' if 'search' in words else 'find') + 1:]:
-                        if word in ['for', 'my', 'the']:
-                            continue
-                        query_words.append(word)
-                    return ' '.join(query_words) if query_words else None
-            except:
-                pass
-        
-        return None
+        # Fallback: take the words after a "search" (preferred) or "find" word
+        words = command.split()
+        verb_index = None
+        for index, word in enumerate(words):
+            if word == 'search':
+                verb_index = index
+                break
+            if word == 'find' and verb_index is None:
+                verb_index = index
+        if verb_index is None:
+            return None
 
-    def _extract_file_operation(self, command: str) -> Optional[str]:
+        query = ' '.join(word for word in words[verb_index + 1:] if word not in _SEARCH_STOP_WORDS)
+        return query if query else None
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _extract_file_operation(command: str) -> Optional[str]:
         """Extract file operation from command"""
-        operations = {
-            'copy': ['copy', 'duplicate'],
-            'move': ['move', 'transfer'],
-            'delete': ['delete', 'remove', 'trash'],
-            'backup': ['backup', 'save copy']
-        }
-        
-        for operation, keywords in operations.items():
-            if any(keyword in command for keyword in keywords):
-                return operation
-        
-        return None
+        rank = min(
+            (_FILE_OPERATION_WORDS[word] for word in _FILE_OPERATION_RE.findall(command)),
+            default=None
+        )
+        return None if rank is None else _FILE_OPERATIONS[rank]
 
     async def _build_command_registry(self):
         """Build registry of supported commands"""
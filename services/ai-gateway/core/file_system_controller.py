@@ -1,17 +1,138 @@
 # services/ai-gateway/core/file_system_controller.py
 import os
-import glob
+import heapq
+import json
+import shutil
+import stat as stat_module
+import time
+from collections import OrderedDict
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
-from pathlib import Path
 import logging
 from datetime import datetime, timedelta
 
+# Per search root, the set of 3-grams of every file name below it: a query
+# containing a 3-gram outside the set cannot match, so the walk is skipped
+# unless a directory below the root has changed since the index was built.
+TRIGRAM_INDEX_TTL = 30.0
+TRIGRAM_INDEX_MAX_SIZE = 200_000
+TRIGRAM_INDEX_MAX_ROOTS = 32
+# Directory mtimes this close to the build time count as changes, since some
+# filesystems only keep timestamps to the second (FAT: two seconds)
+_MTIME_GRANULARITY = 2.0
+
+# renameat(2) with directory fds skips resolving the full path on every move
+_RENAME_DIR_FD = os.rename in os.supports_dir_fd
+_DIRECTORY_OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0)
+
+# File extension (lowercase, with the dot) to category
+_EXTENSION_CATEGORIES = {
+    '.pdf': 'documents',
+    '.doc': 'documents', '.docx': 'documents',
+    '.txt': 'documents', '.rtf': 'documents',
+    '.jpg': 'images', '.jpeg': 'images', '.png': 'images',
+    '.gif': 'images', '.bmp': 'images', '.svg': 'images',
+    '.mp4': 'videos', '.avi': 'videos', '.mov': 'videos',
+    '.mkv': 'videos', '.mpg': 'videos',
+    '.mp3': 'audio', '.wav': 'audio', '.flac': 'audio',
+    '.aac': 'audio', '.ogg': 'audio',
+    '.zip': 'archives', '.rar': 'archives', '.7z': 'archives',
+    '.tar': 'archives', '.gz': 'archives',
+    '.exe': 'executables', '.msi': 'executables',
+    '.py': 'code', '.js': 'code', '.html': 'code',
+    '.css': 'code', '.json': 'code', '.xml': 'code'
+}
+
+# Recently accessed files persisted between runs: read at startup, then
+# refreshed from the system (and rewritten) once the list is this old
+RECENT_FILES_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "ai-gateway", "recent_files.json")
+RECENT_FILES_REFRESH_INTERVAL = 60.0
+
+# Upper bound on renames in flight at once while organizing a directory
+ORGANIZE_MAX_CONCURRENT_MOVES = 64
+
+# Directory walks are syscall-bound and release the GIL, so subtrees are
+# walked concurrently on a shared pool
+_WALK_POOL = ThreadPoolExecutor(
+    max_workers=min(32, (os.cpu_count() or 1) * 4),
+    thread_name_prefix="fs-walk"
+)
+
+def _list_directory(root: str):
+    """Split a directory into (file entries, subdirectory paths)"""
+    files, subdirs = [], []
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file():
+                        files.append(entry)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return files, subdirs
+
+def _iter_files(root: str, directories: Optional[list] = None):
+    """Yield a DirEntry for every file below root
+
+    os.scandir hands back the file type with each directory entry, so the
+    walk itself needs no per-entry stat; symlinked directories are not
+    followed, and unreadable directories are skipped. If a directories list
+    is given, every directory visited is appended to it.
+    """
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        if directories is not None:
+            directories.append(path)
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            yield entry
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+def _directories_unchanged(directories: List[str], since: float) -> bool:
+    """True if none of the directories was modified (or removed) after since
+
+    Creating, renaming or deleting a file updates its directory's mtime, so
+    this tells whether the set of names below them may have changed.
+    """
+    threshold = since - _MTIME_GRANULARITY
+    for path in directories:
+        try:
+            if os.stat(path).st_mtime >= threshold:
+                return False
+        except OSError:
+            return False
+    return True
+
 class FileSystemController:
     def __init__(self):
         self.recent_files = []
+        # type -> recent files of that type, in recent_files order
+        self._recent_by_type = {}
+        self._recent_loaded_at = float('-inf')
         self.is_initialized = False
 
+        # Content search backends, resolved once: ripgrep if installed, else grep
+        self._rg_path = shutil.which('rg')
+        self._grep_path = shutil.which('grep')
+
+        # abspath of search root -> (expires, build wall time, set of name
+        # 3-grams, directories walked), LRU-ordered
+        self._trigram_index = OrderedDict()
+
     async def initialize(self):
         """Initialize the file system controller"""
         try:
@@ -37,9 +158,8 @@ class FileSystemController:
             else:
                 results = await self._filename_search(query, search_dir, file_types)
             
-            # Sort by relevance and return
-            sorted_results = sorted(results, key=lambda x: x.get('relevance', 0), reverse=True)
-            return sorted_results[:50]  # Limit results
+            # Top results by relevance, without sorting the full result set
+            return heapq.nlargest(50, results, key=lambda x: x.get('relevance', 0))  # Limit results
             
         except Exception as e:
             logging.error(f"File search failed: {e}")
@@ -48,29 +168,63 @@ class FileSystemController:
     async def organize_files(self, directory: str, strategy: str = "type") -> Dict[str, Any]:
         """Organize files in a directory using specified strategy"""
         try:
-            target_dir = Path(directory)
-            if not target_dir.exists():
+            if not os.path.exists(directory):
                 raise ValueError(f"Directory {directory} does not exist")
             
-            organized_count = 0
             categories = {}
-            
-            for file_path in target_dir.iterdir():
-                if file_path.is_file():
-                    category = await self._categorize_file(file_path, strategy)
-                    
-                    if category not in categories:
-                        categories[category] = []
-                    
+            # Files are about to move, so cached name indexes may be stale
+            self._trigram_index.clear()
+
+            # List and categorize once up front; the DirEntry objects carry the
+            # type (and, once read, the stat) so this needs no further lookups
+            moves = await asyncio.to_thread(self._plan_moves, directory, strategy)
+            for _, category in moves:
+                categories.setdefault(category, [])
+
+            # Source and category directories are opened once and moves are
+            # made relative to them where the platform supports it
+            src_fd = os.open(directory, _DIRECTORY_OPEN_FLAGS) if _RENAME_DIR_FD else None
+            dst_fds = {}
+            try:
+                for category in categories:
                     # Create category directory if it doesn't exist
-                    category_dir = target_dir / category
-                    category_dir.mkdir(exist_ok=True)
-                    
-                    # Move file to category directory
-                    new_path = category_dir / file_path.name
-                    file_path.rename(new_path)
-                    categories[category].append(str(new_path))
-                    organized_count += 1
+                    category_dir = os.path.join(directory, category)
+                    os.makedirs(category_dir, exist_ok=True)
+                    if src_fd is not None:
+                        dst_fds[category] = os.open(category_dir, _DIRECTORY_OPEN_FLAGS)
+
+                # Moves are independent, so they run concurrently off the loop
+                semaphore = asyncio.Semaphore(ORGANIZE_MAX_CONCURRENT_MOVES)
+
+                async def move(entry: os.DirEntry, category: str):
+                    async with semaphore:
+                        if src_fd is not None:
+                            await asyncio.to_thread(
+                                os.rename, entry.name, entry.name,
+                                src_dir_fd=src_fd, dst_dir_fd=dst_fds[category]
+                            )
+                        else:
+                            await asyncio.to_thread(
+                                os.rename, entry.path, os.path.join(directory, category, entry.name)
+                            )
+
+                # Every move is awaited before the directory fds are closed
+                outcomes = await asyncio.gather(
+                    *(move(entry, category) for entry, category in moves),
+                    return_exceptions=True
+                )
+            finally:
+                for fd in dst_fds.values():
+                    os.close(fd)
+                if src_fd is not None:
+                    os.close(src_fd)
+
+            organized_count = 0
+            for (entry, category), outcome in zip(moves, outcomes):
+                if isinstance(outcome, BaseException):
+                    raise outcome
+                categories[category].append(os.path.join(directory, category, entry.name))
+                organized_count += 1
             
             return {
                 'strategy': strategy,
@@ -83,15 +237,22 @@ class FileSystemController:
             logging.error(f"File organization failed: {e}")
             raise
 
+    def _plan_moves(self, directory: str, strategy: str) -> List[tuple]:
+        """List the files of a directory paired with their target category"""
+        with os.scandir(directory) as entries:
+            files = [entry for entry in entries if entry.is_file()]
+        return [(entry, self._categorize_file(entry, strategy)) for entry in files]
+
     async def get_recent_files(self, limit: int = 20, file_type: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get recently accessed files"""
         try:
-            recent_files = await self._get_recent_files_system()
-            
+            # Served from memory; the list is refreshed once it goes stale
+            if time.monotonic() - self._recent_loaded_at >= RECENT_FILES_REFRESH_INTERVAL:
+                await self._refresh_recent_files()
             if file_type:
-                recent_files = [f for f in recent_files if f.get('type') == file_type]
+                return self._recent_by_type.get(file_type, [])[:limit]
             
-            return recent_files[:limit]
+            return self.recent_files[:limit]
             
         except Exception as e:
             logging.error(f"Failed to get recent files: {e}")
@@ -113,31 +274,46 @@ class FileSystemController:
         results = []
         
         try:
-            # Use platform-specific tools for content search
-            if os.name == 'posix':  # Linux/Mac
-                # Use grep for content search
-                file_pattern = f"*.{{{','.join(file_types)}}}" if file_types else "*"
-                cmd = f"grep -rl '{query}' {directory} --include='{file_pattern}'"
-                process = await asyncio.create_subprocess_shell(
-                    cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                stdout, stderr = await process.communicate()
-                
-                if stdout:
-                    file_paths = stdout.decode().splitlines()
-                    for file_path in file_paths:
-                        if os.path.isfile(file_path):
-                            stat = os.stat(file_path)
-                            results.append({
-                                'path': file_path,
-                                'name': os.path.basename(file_path),
-                                'size': stat.st_size,
-                                'modified': datetime.fromtimestamp(stat.st_mtime),
-                                'type': os.path.splitext(file_path)[1],
-                                'relevance': 0.8  # Content matches are highly relevant
-                            })
+            # Literal search via argv (no shell), listing matching files NUL-separated
+            globs = [f"*.{ext.lstrip('.')}" for ext in file_types]
+            if self._rg_path:
+                # ripgrep searches files in parallel; match grep -r's coverage
+                argv = [self._rg_path, '--files-with-matches', '--null', '--fixed-strings',
+                        '--no-messages', '--hidden', '--no-ignore']
+                for pattern in globs:
+                    argv += ['--glob', pattern]
+            elif self._grep_path:
+                argv = [self._grep_path, '-rlZF', '--no-messages']
+                argv += [f"--include={pattern}" for pattern in globs]
+            else:
+                raise RuntimeError("neither ripgrep nor grep is available")
+            argv += ['--', query, directory]
+
+            process = await asyncio.create_subprocess_exec(
+                *argv,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await process.communicate()
+            
+            for raw_path in stdout.split(b'\0'):
+                if not raw_path:
+                    continue
+                file_path = os.fsdecode(raw_path)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                if not stat_module.S_ISREG(stat.st_mode):
+                    continue
+                results.append({
+                    'path': file_path,
+                    'name': os.path.basename(file_path),
+                    'size': stat.st_size,
+                    'modified': datetime.fromtimestamp(stat.st_mtime),
+                    'type': os.path.splitext(file_path)[1],
+                    'relevance': 0.8  # Content matches are highly relevant
+                })
             
         except Exception as e:
             logging.warning(f"Content search failed, falling back to filename search: {e}")
@@ -148,64 +324,138 @@ class FileSystemController:
     async def _filename_search(self, query: str, directory: str, file_types: List[str]) -> List[Dict[str, Any]]:
         """Search files by filename"""
         results = []
-        search_dir = Path(directory)
         
         try:
-            # Build search pattern
-            if file_types:
-                patterns = [f"*{query}*.{ext}" for ext in file_types]
-            else:
-                patterns = [f"*{query}*"]
+            # Matched case-insensitively: the query anywhere in the name, and
+            # one of the extensions (endswith also handles "tar.gz") if given
+            extensions = tuple({'.' + ext.lower().lstrip('.') for ext in file_types})
+            query_lower = query.lower()
+
+            loop = asyncio.get_running_loop()
+            root = os.path.abspath(directory)
+            now = time.monotonic()
+            cached = self._get_trigram_index(root, now)
+            building = cached is None
+            if not building:
+                _, built_at, trigrams, directories = cached
+                if any(query_lower[i:i + 3] not in trigrams for i in range(len(query_lower) - 2)):
+                    # A name added since the build would have touched its directory
+                    if await loop.run_in_executor(_WALK_POOL, _directories_unchanged, directories, built_at):
+                        return results
+                    building = True
+            built_at = time.time()
             
-            # Search for files matching patterns
-            for pattern in patterns:
-                for file_path in search_dir.rglob(pattern):
-                    if file_path.is_file():
-                        try:
-                            stat = file_path.stat()
-                            relevance = self._calculate_relevance(file_path.name, query)
-                            
-                            results.append({
-                                'path': str(file_path),
-                                'name': file_path.name,
-                                'size': stat.st_size,
-                                'modified': datetime.fromtimestamp(stat.st_mtime),
-                                'type': file_path.suffix,
-                                'relevance': relevance
-                            })
-                        except (OSError, PermissionError):
-                            continue  # Skip files we can't access
+            # Walk each top-level subtree on its own worker thread; every file
+            # is visited (and reported) only once
+            files, subdirs = await loop.run_in_executor(_WALK_POOL, _list_directory, directory)
+            # One 3-gram set and directory list per batch, merged afterwards,
+            # so threads never share one
+            sinks = [set() if building else None for _ in range(len(subdirs) + 1)]
+            walked = [[] if building else None for _ in subdirs]
+            batches = await asyncio.gather(
+                loop.run_in_executor(_WALK_POOL, self._match_files, files, query, extensions, sinks[0]),
+                *(
+                    loop.run_in_executor(_WALK_POOL, self._match_files, _iter_files(subdir, directories),
+                                         query, extensions, sink)
+                    for subdir, directories, sink in zip(subdirs, walked, sinks[1:])
+                )
+            )
+            for batch in batches:
+                results.extend(batch)
+
+            if building:
+                trigrams = set().union(*sinks)
+                if len(trigrams) <= TRIGRAM_INDEX_MAX_SIZE:
+                    directories = [directory]
+                    for subtree in walked:
+                        directories.extend(subtree)
+                    self._put_trigram_index(root, (now + TRIGRAM_INDEX_TTL, built_at, trigrams, directories), now)
+                else:
+                    self._trigram_index.pop(root, None)
             
         except Exception as e:
             logging.error(f"Filename search failed: {e}")
         
         return results
 
+    def _get_trigram_index(self, root: str, now: float) -> Optional[tuple]:
+        """The unexpired trigram index for root, or None"""
+        cached = self._trigram_index.get(root)
+        if cached is None:
+            return None
+        if now >= cached[0]:
+            del self._trigram_index[root]
+            return None
+        self._trigram_index.move_to_end(root)
+        return cached
+
+    def _put_trigram_index(self, root: str, index: tuple, now: float):
+        """Store a root's index, dropping expired roots and the least recently used beyond TRIGRAM_INDEX_MAX_ROOTS"""
+        for expired in [key for key, cached in self._trigram_index.items() if now >= cached[0]]:
+            del self._trigram_index[expired]
+        self._trigram_index[root] = index
+        self._trigram_index.move_to_end(root)
+        while len(self._trigram_index) > TRIGRAM_INDEX_MAX_ROOTS:
+            self._trigram_index.popitem(last=False)
+
+    def _match_files(self, entries, query: str, extensions: tuple,
+                     trigrams: Optional[set] = None) -> List[Dict[str, Any]]:
+        """Build results for the entries whose names match (runs on a walk thread)
+
+        If a trigrams set is given, the 3-grams of every visited name are added to it.
+        """
+        query_lower = query.lower()
+        results = []
+        for entry in entries:
+            name = entry.name
+            name_lower = name.lower()
+            if trigrams is not None:
+                trigrams.update([name_lower[i:i + 3] for i in range(len(name_lower) - 2)])
+            if query_lower not in name_lower:
+                continue
+            if extensions and not name_lower.endswith(extensions):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue  # Skip files we can't access
+
+            results.append({
+                'path': entry.path,
+                'name': name,
+                'size': stat.st_size,
+                'modified': datetime.fromtimestamp(stat.st_mtime),
+                'type': os.path.splitext(name)[1],
+                'relevance': self._calculate_relevance(name_lower, query_lower)
+            })
+        return results
+
     async def _enhanced_keyword_search(self, query: str, directory: str, file_types: List[str]) -> List[Dict[str, Any]]:
         """Enhanced keyword search with relevance scoring"""
         filename_results = await self._filename_search(query, directory, file_types)
+        query_lower = query.lower()
         
         # Enhance with additional metadata and relevance scoring
         for result in filename_results:
             # Add additional relevance factors
-            path_relevance = self._calculate_path_relevance(result['path'], query)
+            path_relevance = self._calculate_path_relevance(result['path'], query_lower)
             result['relevance'] = max(result['relevance'], path_relevance)
             
             # Add file category
-            result['category'] = await self._get_file_category(result['path'])
+            result['category'] = self._get_file_category(result['path'])
         
         return filename_results
 
-    async def _categorize_file(self, file_path: Path, strategy: str) -> str:
+    def _categorize_file(self, entry: os.DirEntry, strategy: str) -> str:
         """Categorize a file based on the specified strategy"""
         if strategy == "type":
-            return self._get_file_category(str(file_path))
+            return self._get_file_category(entry.name)
         elif strategy == "date":
-            stat = file_path.stat()
+            stat = entry.stat()
             file_date = datetime.fromtimestamp(stat.st_mtime)
             return file_date.strftime("%Y-%m")
         elif strategy == "size":
-            stat = file_path.stat()
+            stat = entry.stat()
             size_mb = stat.st_size / (1024 * 1024)
             if size_mb < 1:
                 return "small"
@@ -218,32 +468,11 @@ class FileSystemController:
 
     def _get_file_category(self, file_path: str) -> str:
         """Get file category based on extension"""
-        extension = Path(file_path).suffix.lower()
-        
-        categories = {
-            '.pdf': 'documents',
-            '.doc': 'documents', '.docx': 'documents',
-            '.txt': 'documents', '.rtf': 'documents',
-            '.jpg': 'images', '.jpeg': 'images', '.png': 'images',
-            '.gif': 'images', '.bmp': 'images', '.svg': 'images',
-            '.mp4': 'videos', '.avi': 'videos', '.mov': 'videos',
-            '.mkv': 'videos', '.mpg': 'videos',
-            '.mp3': 'audio', '.wav': 'audio', '.flac': 'audio',
-            '.aac': 'audio', '.ogg': 'audio',
-            '.zip': 'archives', '.rar': 'archives', '.7z': 'archives',
-            '.tar': 'archives', '.gz': 'archives',
-            '.exe': 'executables', '.msi': 'executables',
-            '.py': 'code', '.js': 'code', '.html': 'code',
-            '.css': 'code', '.json': 'code', '.xml': 'code'
-        }
-        
-        return categories.get(extension, 'other')
+        extension = os.path.splitext(file_path)[1].lower()
+        return _EXTENSION_CATEGORIES.get(extension, 'other')
 
-    def _calculate_relevance(self, filename: str, query: str) -> float:
-        """Calculate relevance score for a filename match"""
-        filename_lower = filename.lower()
-        query_lower = query.lower()
-        
+    def _calculate_relevance(self, filename_lower: str, query_lower: str) -> float:
+        """Calculate relevance score for a filename match (both already lowercased)"""
         relevance = 0.0
         
         # Exact match
@@ -264,10 +493,9 @@ class FileSystemController:
         
         return min(relevance, 1.0)
 
-    def _calculate_path_relevance(self, file_path: str, query: str) -> float:
-        """Calculate relevance based on file path"""
+    def _calculate_path_relevance(self, file_path: str, query_lower: str) -> float:
+        """Calculate relevance based on file path (query already lowercased)"""
         path_lower = file_path.lower()
-        query_lower = query.lower()
         
         if query_lower in path_lower:
             # Higher relevance if query appears in directory names
@@ -292,6 +520,59 @@ class FileSystemController:
         ]
 
     async def _load_recent_files(self):
-        """Load recent files from cache"""
-        # In production, this would load from a persistent cache
-        self.recent_files = []
+        """Load recent files from cache, falling back to the system list"""
+        recent_files = await asyncio.to_thread(self._read_recent_files_cache)
+        if recent_files is None:
+            await self._refresh_recent_files()
+        else:
+            self._set_recent_files(recent_files)
+
+    async def _refresh_recent_files(self):
+        """Reload recent files from the system and persist them to the cache"""
+        recent_files = await self._get_recent_files_system()
+        self._set_recent_files(recent_files)
+        try:
+            await asyncio.to_thread(self._write_recent_files_cache, recent_files)
+        except (OSError, TypeError, ValueError) as e:
+            logging.warning(f"Failed to write recent files cache: {e}")
+
+    def _set_recent_files(self, recent_files: List[Dict[str, Any]]):
+        """Replace the recent files list and rebuild its per-type index"""
+        self.recent_files = recent_files
+        self._recent_loaded_at = time.monotonic()
+        self._recent_by_type = {}
+        for recent in recent_files:
+            self._recent_by_type.setdefault(recent.get('type'), []).append(recent)
+
+    def _read_recent_files_cache(self) -> Optional[List[Dict[str, Any]]]:
+        """Read the persisted recent files list, or None if there is none"""
+        try:
+            with open(RECENT_FILES_CACHE, 'rb') as cache:
+                recent_files = json.load(cache)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(recent_files, list):
+            return None
+        valid = []
+        for recent in recent_files:
+            try:
+                recent['last_accessed'] = datetime.fromisoformat(recent['last_accessed'])
+            except (KeyError, TypeError, ValueError):
+                continue  # Skip malformed entries
+            valid.append(recent)
+        return valid
+
+    def _write_recent_files_cache(self, recent_files: List[Dict[str, Any]]):
+        """Atomically replace the persisted recent files list"""
+        os.makedirs(os.path.dirname(RECENT_FILES_CACHE), exist_ok=True)
+        temp_path = f"{RECENT_FILES_CACHE}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w') as cache:
+                json.dump(recent_files, cache, default=datetime.isoformat)
+            os.replace(temp_path, RECENT_FILES_CACHE)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
@@ -16,6 +16,19 @@ class IntentAnalyzer:
         self.logger = logging.getLogger(__name__)
         self.patterns = self._initialize_patterns()
 
+        # Compile every pattern once. The master regex tells, in one match at
+        # position 0, which is the first intent (in list order) with any
+        # pattern matching anywhere: each branch is a lookahead over the text,
+        # closed by a named marker group that becomes match.lastgroup.
+        branches = []
+        self._intent_markers = {}
+        for index, intent_config in enumerate(self.patterns):
+            intent_config['compiled'] = [re.compile(pattern) for pattern in intent_config['patterns']]
+            marker = f"intent{index}"
+            self._intent_markers[marker] = intent_config
+            branches.append(f"(?=[\\s\\S]*?(?:{'|'.join(intent_config['patterns'])}))(?P<{marker}>)")
+        self._intent_regex = re.compile('|'.join(branches))
+
     async def initialize(self):
         """Initialize the intent analyzer"""
         self.logger.info("Intent analyzer initialized")
@@ -24,23 +37,28 @@ class IntentAnalyzer:
         """Analyze text to extract intent and entities"""
         text_lower = text.lower().strip()
         
-        # Check each pattern
-        for intent_config in self.patterns:
-            for pattern in intent_config['patterns']:
-                match = re.search(pattern, text_lower)
+        # Find the matching intent in a single scan, then its first matching pattern
+        intent_match = self._intent_regex.match(text_lower)
+        if intent_match:
+            intent_config = self._intent_markers[intent_match.lastgroup]
+            for pattern in intent_config['compiled']:
+                match = pattern.search(text_lower)
                 if match:
-                    entities = intent_config['entity_extractor'](match, text)
-                    return IntentResult(
-                        intent=intent_config['intent'],
-                        confidence=0.9,  # High confidence for pattern matches
-                        entities=entities,
-                        action=intent_config['action'],
-                        parameters=intent_config.get('parameter_extractor', lambda m, t: {})(match, text)
-                    )
+                    return self._pattern_result(intent_config, match, text)
         
         # Fallback to general intent
         return self._fallback_analysis(text)
 
+    def _pattern_result(self, intent_config: Dict, match, text: str) -> IntentResult:
+        """Build the result for a pattern match of the given intent"""
+        return IntentResult(
+            intent=intent_config['intent'],
+            confidence=0.9,  # High confidence for pattern matches
+            entities=intent_config['entity_extractor'](match, text),
+            action=intent_config['action'],
+            parameters=intent_config.get('parameter_extractor', lambda m, t: {})(match, text)
+        )
+
     def _initialize_patterns(self) -> List[Dict]:
         """Initialize intent recognition patterns"""
         return [
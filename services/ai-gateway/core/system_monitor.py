@@ -1,13 +1,42 @@
 # services/ai-gateway/core/system_monitor.py
 import asyncio
+import heapq
+import os
+import sys
 import psutil
 import platform
 import logging
+import operator
+import time
+from collections import deque
+from functools import lru_cache
+from itertools import islice
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from dataclasses import dataclass
 
-@dataclass
+# Counting connections walks every open fd on the system (or, on Linux, the
+# kernel's socket tables), so the count is reused for a while
+CONNECTION_COUNT_TTL = 15.0
+
+# Kernel socket tables covering psutil's 'inet' kind; one header line each
+_PROC_NET_INET_TABLES = ('/proc/net/tcp', '/proc/net/tcp6', '/proc/net/udp', '/proc/net/udp6')
+_USE_PROC_NET = sys.platform.startswith('linux') and os.path.exists(_PROC_NET_INET_TABLES[0])
+
+def _count_inet_connections() -> int:
+    """Number of open inet sockets"""
+    if not _USE_PROC_NET:
+        return len(psutil.net_connections())
+    count = 0
+    for table in _PROC_NET_INET_TABLES:
+        try:
+            with open(table, 'rb') as lines:
+                count += sum(1 for _ in lines) - 1
+        except OSError:
+            continue  # e.g. no IPv6
+    return count
+
+@dataclass(slots=True)
 class ProcessInfo:
     pid: int
     name: str
@@ -18,7 +47,7 @@ class ProcessInfo:
     create_time: float
     command: str
 
-@dataclass
+@dataclass(slots=True)
 class SystemMetrics:
     cpu_usage: float
     memory_usage: float
@@ -30,16 +59,109 @@ class SystemMetrics:
     boot_time: float
     uptime: float
 
+# Alert rule condition name -> comparison of (metric value, threshold)
+_ALERT_CONDITIONS = {
+    'gt': operator.gt,
+    'lt': operator.lt,
+    'eq': operator.eq,
+    'ge': operator.ge,
+    'le': operator.le
+}
+
+# Alert rules are checked every tick against a handful of metric paths
+@lru_cache(maxsize=256)
+def _split_metric_path(metric_path: str) -> tuple:
+    """Keys of a dotted metric path"""
+    return tuple(metric_path.split('.'))
+
+# Blocking psutil reads; the async methods run these in a worker thread so a
+# slow /proc or disk does not stall the event loop
+
+def _read_cpu_stats(sample: bool):
+    """Per-core usage (None unless sample), CPU times, frequency (or None) and load average"""
+    # Usage since the previous sample (primed at initialization), without
+    # sleeping; psutil keeps one global previous sample, so only one caller
+    # may take them
+    per_cpu = psutil.cpu_percent(interval=None, percpu=True) if sample else None
+    cpu_times = psutil.cpu_times()
+    try:
+        cpu_freq = psutil.cpu_freq()
+    except Exception:
+        cpu_freq = None
+    # Load average is only available on Unix-like systems
+    load_avg = psutil.getloadavg() if hasattr(psutil, 'getloadavg') else (0, 0, 0)
+    return per_cpu, cpu_times, cpu_freq, load_avg
+
+def _read_memory_stats():
+    """Virtual memory and swap usage"""
+    return psutil.virtual_memory(), psutil.swap_memory()
+
+def _read_disk_stats(path: str):
+    """Usage of the disk holding path and system-wide disk I/O counters"""
+    return psutil.disk_usage(path), psutil.disk_io_counters()
+
+def _list_processes() -> List[ProcessInfo]:
+    """Resource usage of every running process"""
+    processes = []
+
+    for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 
+                                     'memory_info', 'status', 'create_time', 'cmdline']):
+        try:
+            # Get process info
+            cpu_percent = proc.info['cpu_percent'] or 0
+            memory_percent = proc.info['memory_percent'] or 0
+            memory_rss = proc.info['memory_info'].rss if proc.info['memory_info'] else 0
+            command = ' '.join(proc.info['cmdline']) if proc.info['cmdline'] else proc.info['name']
+
+            process_info = ProcessInfo(
+                pid=proc.info['pid'],
+                name=proc.info['name'],
+                cpu_percent=cpu_percent,
+                memory_percent=memory_percent,
+                memory_rss=memory_rss,
+                status=proc.info['status'],
+                create_time=proc.info['create_time'],
+                command=command[:100]  # Limit command length
+            )
+
+            processes.append(process_info)
+
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            continue
+
+    return processes
+
+def _terminate_process(pid: int) -> bool:
+    """Terminate a process, killing it if it does not exit in time; True if killed"""
+    process = psutil.Process(pid)
+    process.terminate()  # Graceful termination
+    
+    # Wait for process to terminate
+    try:
+        process.wait(timeout=5)
+        return False
+    except psutil.TimeoutExpired:
+        # Force kill if graceful termination fails
+        process.kill()
+        return True
+
 class SystemMonitor:
     def __init__(self):
         self.monitoring = False
         self.monitoring_interval = 5  # seconds
         self.monitoring_task = None
-        self.metrics_history = []
         self.max_history_size = 100
+        # Oldest snapshots fall off the left as new ones are appended
+        self.metrics_history = deque(maxlen=self.max_history_size)
         self.alert_rules = []
         self.is_initialized = False
 
+        # (monotonic expiry, active connection count)
+        self._connection_count_cache = (0.0, 0)
+        # Per-core usage from the latest sample, taken by the monitoring tick
+        # while monitoring runs
+        self._per_cpu_sample = None
+
     async def initialize(self):
         """Initialize system monitor"""
         try:
@@ -73,27 +195,24 @@ class SystemMonitor:
                 pass
         logging.info("System monitoring stopped")
 
-    async def get_cpu_usage(self) -> Dict[str, Any]:
-        """Get detailed CPU usage information"""
+    async def get_cpu_usage(self, timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Get detailed CPU usage information (stamped with timestamp if given)"""
+        # While monitoring runs, usage comes from the tick's latest sample
+        return await self._cpu_usage(timestamp, sample=not self.monitoring)
+
+    async def _cpu_usage(self, timestamp: Optional[str], sample: bool) -> Dict[str, Any]:
+        """CPU usage, taking a new per-core sample if asked to (or if there is none yet)"""
         try:
-            # Get per-core usage
-            per_cpu = psutil.cpu_percent(interval=0.1, percpu=True)
-            total_cpu = psutil.cpu_percent(interval=0.1)
-            
-            # Get CPU times
-            cpu_times = psutil.cpu_times()
-            
-            # Get CPU frequency
-            try:
-                cpu_freq = psutil.cpu_freq()
-                current_freq = cpu_freq.current if cpu_freq else None
-                max_freq = cpu_freq.max if cpu_freq else None
-            except:
-                current_freq = None
-                max_freq = None
-            
-            # Get load average (Unix-like systems)
-            load_avg = psutil.getloadavg() if hasattr(psutil, 'getloadavg') else (0, 0, 0)
+            sample = sample or self._per_cpu_sample is None
+            per_cpu, cpu_times, cpu_freq, load_avg = await asyncio.to_thread(_read_cpu_stats, sample)
+            if sample:
+                self._per_cpu_sample = per_cpu
+            else:
+                per_cpu = list(self._per_cpu_sample)
+            # The total is the average over cores
+            total_cpu = round(sum(per_cpu) / len(per_cpu), 1) if per_cpu else 0.0
+            current_freq = cpu_freq.current if cpu_freq else None
+            max_freq = cpu_freq.max if cpu_freq else None
             
             return {
                 'total_usage': total_cpu,
@@ -107,18 +226,17 @@ class SystemMonitor:
                 'load_1min': load_avg[0],
                 'load_5min': load_avg[1],
                 'load_15min': load_avg[2],
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': timestamp or datetime.utcnow().isoformat()
             }
             
         except Exception as e:
             logging.error(f"Failed to get CPU usage: {e}")
             raise
 
-    async def get_memory_usage(self) -> Dict[str, Any]:
-        """Get detailed memory usage information"""
+    async def get_memory_usage(self, timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Get detailed memory usage information (stamped with timestamp if given)"""
         try:
-            memory = psutil.virtual_memory()
-            swap = psutil.swap_memory()
+            memory, swap = await asyncio.to_thread(_read_memory_stats)
             
             return {
                 'total': memory.total,
@@ -130,18 +248,17 @@ class SystemMonitor:
                 'swap_used': swap.used,
                 'swap_free': swap.free,
                 'swap_percent': swap.percent,
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': timestamp or datetime.utcnow().isoformat()
             }
             
         except Exception as e:
             logging.error(f"Failed to get memory usage: {e}")
             raise
 
-    async def get_disk_usage(self, path: str = "/") -> Dict[str, Any]:
-        """Get disk usage information"""
+    async def get_disk_usage(self, path: str = "/", timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Get disk usage information (stamped with timestamp if given)"""
         try:
-            disk = psutil.disk_usage(path)
-            disk_io = psutil.disk_io_counters()
+            disk, disk_io = await asyncio.to_thread(_read_disk_stats, path)
             
             return {
                 'total': disk.total,
@@ -153,7 +270,7 @@ class SystemMonitor:
                 'read_count': disk_io.read_count if disk_io else 0,
                 'write_count': disk_io.write_count if disk_io else 0,
                 'path': path,
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': timestamp or datetime.utcnow().isoformat()
             }
             
         except Exception as e:
@@ -163,41 +280,10 @@ class SystemMonitor:
     async def get_running_processes(self, limit: int = 50) -> List[ProcessInfo]:
         """Get list of running processes with resource usage"""
         try:
-            processes = []
+            processes = await asyncio.to_thread(_list_processes)
             
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 
-                                           'memory_info', 'status', 'create_time', 'cmdline']):
-                try:
-                    # Limit the number of processes we return
-                    if len(processes) >= limit:
-                        break
-                    
-                    # Get process info
-                    cpu_percent = proc.info['cpu_percent'] or 0
-                    memory_percent = proc.info['memory_percent'] or 0
-                    memory_rss = proc.info['memory_info'].rss if proc.info['memory_info'] else 0
-                    command = ' '.join(proc.info['cmdline']) if proc.info['cmdline'] else proc.info['name']
-                    
-                    process_info = ProcessInfo(
-                        pid=proc.info['pid'],
-                        name=proc.info['name'],
-                        cpu_percent=cpu_percent,
-                        memory_percent=memory_percent,
-                        memory_rss=memory_rss,
-                        status=proc.info['status'],
-                        create_time=proc.info['create_time'],
-                        command=command[:100]  # Limit command length
-                    )
-                    
-                    processes.append(process_info)
-                    
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    continue
-            
-            # Sort by CPU usage (descending)
-            processes.sort(key=lambda p: p.cpu_percent, reverse=True)
-            
-            return processes
+            # Top processes by CPU usage (descending), without sorting them all
+            return heapq.nlargest(limit, processes, key=lambda p: p.cpu_percent)
             
         except Exception as e:
             logging.error(f"Failed to get running processes: {e}")
@@ -206,19 +292,11 @@ class SystemMonitor:
     async def kill_process(self, pid: int) -> bool:
         """Kill a process by PID"""
         try:
-            process = psutil.Process(pid)
-            process.terminate()  # Graceful termination
-            
-            # Wait for process to terminate
-            try:
-                process.wait(timeout=5)
-                logging.info(f"Process {pid} terminated successfully")
-                return True
-            except psutil.TimeoutExpired:
-                # Force kill if graceful termination fails
-                process.kill()
+            if await asyncio.to_thread(_terminate_process, pid):
                 logging.warning(f"Process {pid} force killed")
-                return True
+            else:
+                logging.info(f"Process {pid} terminated successfully")
+            return True
                 
         except psutil.NoSuchProcess:
             logging.error(f"Process {pid} does not exist")
@@ -233,17 +311,16 @@ class SystemMonitor:
     async def get_system_info(self) -> Dict[str, Any]:
         """Get comprehensive system information"""
         try:
-            # CPU information
-            cpu_info = await self.get_cpu_usage()
-            
-            # Memory information
-            memory_info = await self.get_memory_usage()
-            
-            # Disk information
-            disk_info = await self.get_disk_usage()
+            # One timestamp for the whole report and each of its sections
+            timestamp = datetime.utcnow().isoformat()
             
-            # Network information
-            network_info = await self._get_network_info()
+            # CPU, memory, disk and network information, read concurrently
+            cpu_info, memory_info, disk_info, network_info = await asyncio.gather(
+                self.get_cpu_usage(timestamp),
+                self.get_memory_usage(timestamp),
+                self.get_disk_usage(timestamp=timestamp),
+                self._get_network_info(timestamp)
+            )
             
             # System information
             boot_time = psutil.boot_time()
@@ -263,7 +340,7 @@ class SystemMonitor:
                 'network': network_info,
                 'boot_time': boot_time,
                 'uptime': uptime,
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': timestamp
             }
             
         except Exception as e:
@@ -272,7 +349,9 @@ class SystemMonitor:
 
     async def get_metrics_history(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get historical system metrics"""
-        return self.metrics_history[-limit:]
+        if limit <= 0:
+            return list(self.metrics_history)[-limit:]
+        return list(islice(self.metrics_history, max(0, len(self.metrics_history) - limit), None))
 
     def is_monitoring(self) -> bool:
         """Check if monitoring is active"""
@@ -292,56 +371,81 @@ class SystemMonitor:
     # Private methods
     async def _monitoring_loop(self):
         """Main monitoring loop"""
+        loop = asyncio.get_running_loop()
         while self.monitoring:
+            started = loop.time()
             try:
                 # Collect metrics
                 metrics = await self._collect_metrics()
                 self.metrics_history.append(metrics)
                 
-                # Keep history size limited
-                if len(self.metrics_history) > self.max_history_size:
-                    self.metrics_history.pop(0)
-                
                 # Check alert rules
                 await self._check_alert_rules(metrics)
                 
-                # Wait for next interval
-                await asyncio.sleep(self.monitoring_interval)
-                
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logging.error(f"Monitoring loop error: {e}")
-                await asyncio.sleep(self.monitoring_interval)
+
+            # Wait for the next tick, counting the time this one took, so ticks
+            # stay an interval apart; a tick that overran starts the next at once
+            delay = self.monitoring_interval - (loop.time() - started)
+            if delay <= 0:
+                logging.warning("System monitoring is falling behind its interval")
+            try:
+                await asyncio.sleep(max(0.0, delay))
+            except asyncio.CancelledError:
+                break
 
     async def _collect_metrics(self) -> Dict[str, Any]:
         """Collect all system metrics for history"""
+        # One timestamp for the whole snapshot and each of its sections
+        timestamp = datetime.utcnow().isoformat()
+        # The reads run in worker threads, so they overlap
+        cpu_info, memory_info, disk_info, pids = await asyncio.gather(
+            self._cpu_usage(timestamp, sample=True),
+            self.get_memory_usage(timestamp),
+            self.get_disk_usage(timestamp=timestamp),
+            asyncio.to_thread(psutil.pids)
+        )
         return {
-            'timestamp': datetime.utcnow().isoformat(),
-            'cpu': await self.get_cpu_usage(),
-            'memory': await self.get_memory_usage(),
-            'disk': await self.get_disk_usage(),
-            'process_count': len(await self.get_running_processes(limit=1000))
+            'timestamp': timestamp,
+            'cpu': cpu_info,
+            'memory': memory_info,
+            'disk': disk_info,
+            'process_count': len(pids)
         }
 
-    async def _get_network_info(self) -> Dict[str, Any]:
-        """Get network interface information"""
+    async def _get_network_info(self, timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Get network interface information (stamped with timestamp if given)"""
         try:
-            net_io = psutil.net_io_counters()
-            net_connections = psutil.net_connections()
+            net_io, active_connections = await asyncio.to_thread(self._read_network_stats)
             
             return {
                 'bytes_sent': net_io.bytes_sent,
                 'bytes_recv': net_io.bytes_recv,
                 'packets_sent': net_io.packets_sent,
                 'packets_recv': net_io.packets_recv,
-                'active_connections': len(net_connections),
-                'timestamp': datetime.utcnow().isoformat()
+                'active_connections': active_connections,
+                'timestamp': timestamp or datetime.utcnow().isoformat()
             }
         except Exception as e:
             logging.warning(f"Failed to get network info: {e}")
             return {}
 
+    def _read_network_stats(self):
+        """Interface counters and the active connection count (blocking)"""
+        return psutil.net_io_counters(), self._count_connections()
+
+    def _count_connections(self) -> int:
+        """Number of open inet connections, refreshed at most every CONNECTION_COUNT_TTL"""
+        expires, count = self._connection_count_cache
+        now = time.monotonic()
+        if now >= expires:
+            count = _count_inet_connections()
+            self._connection_count_cache = (now + CONNECTION_COUNT_TTL, count)
+        return count
+
     async def _check_alert_rules(self, metrics: Dict[str, Any]):
         """Check metrics against alert rules"""
         for rule in self.alert_rules:
@@ -353,26 +457,24 @@ class SystemMonitor:
 
     async def _evaluate_alert_rule(self, rule: Dict, metrics: Dict) -> bool:
         """Evaluate a single alert rule"""
-        # Simple threshold-based rules
+        # Simple threshold-based rules; a metric missing from the snapshot never alerts
         metric_value = self._get_metric_value(metrics, rule['metric'])
-        threshold = rule['threshold']
-        
-        if rule['condition'] == 'gt':
-            return metric_value > threshold
-        elif rule['condition'] == 'lt':
-            return metric_value < threshold
-        elif rule['condition'] == 'eq':
-            return metric_value == threshold
-        
-        return False
+        if metric_value is None:
+            return False
+        compare = _ALERT_CONDITIONS.get(rule['condition'])
+        return compare(metric_value, rule['threshold']) if compare else False
 
-    def _get_metric_value(self, metrics: Dict, metric_path: str) -> float:
-        """Get metric value from nested dictionary using dot notation"""
-        keys = metric_path.split('.')
+    def _get_metric_value(self, metrics: Dict, metric_path: str) -> Optional[float]:
+        """Get numeric metric value from nested dictionary using dot notation, or None"""
         value = metrics
-        for key in keys:
-            value = value.get(key, {})
-        return float(value) if value else 0.0
+        for key in _split_metric_path(metric_path):
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        # Missing keys, None readings and paths ending at a section are not numbers
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+        return None
 
     async def _trigger_alert(self, rule: Dict, metrics: Dict):
         """Trigger an alert"""
@@ -382,8 +484,9 @@ class SystemMonitor:
     async def _validate_system_access(self):
         """Validate that we can access system metrics"""
         try:
-            # Test basic metric access
-            psutil.cpu_percent(interval=0.1)
+            # Test basic metric access; this also primes the non-blocking
+            # per-core CPU sampling used by get_cpu_usage
+            psutil.cpu_percent(interval=None, percpu=True)
             psutil.virtual_memory()
             psutil.disk_usage('/')
             psutil.process_iter()
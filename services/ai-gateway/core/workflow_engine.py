@@ -3,7 +3,17 @@ from typing import List, Dict, Any, Optional
 import asyncio
 import logging
 from datetime import datetime
+import hashlib
 import json
+import re
+
+# A parameter value that is entirely a "${context_key}" template
+_TEMPLATE_RE = re.compile(r'\$\{(.*)\}', re.DOTALL)
+
+def _content_digest(value: Any) -> str:
+    """Short digest of a JSON-like value, stable across processes (unlike hash())"""
+    payload = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
 
 class WorkflowEngine:
     def __init__(self, model_selector=None):
@@ -45,7 +55,7 @@ class WorkflowEngine:
             # Estimate execution time
             estimated_duration = await self._estimate_duration(optimized_steps)
             
-            workflow_id = f"wf_{hash(str(steps))}_{datetime.utcnow().timestamp()}"
+            workflow_id = f"wf_{_content_digest(steps)}_{datetime.utcnow().timestamp()}"
             
             return {
                 'workflow_id': workflow_id,
@@ -70,6 +80,9 @@ class WorkflowEngine:
             execution_context = {**parameters, 'workflow_start_time': start_time}
             results = {}
             
+            # Steps by id for O(1) transitions; the first step wins on duplicate ids
+            steps_by_id = {step['id']: step for step in reversed(workflow['steps'])}
+            
             # Execute steps in sequence
             current_step = workflow['steps'][0]
             step_index = 0
@@ -79,7 +92,7 @@ class WorkflowEngine:
                 results[current_step['id']] = step_result
                 
                 # Determine next step
-                current_step = self._get_next_step(workflow['steps'], current_step, execution_context)
+                current_step = self._get_next_step(steps_by_id, current_step, execution_context)
                 step_index += 1
                 
                 # Safety limit
@@ -103,7 +116,7 @@ class WorkflowEngine:
 
     async def create_workflow(self, name: str, steps: List[Dict], trigger_type: str, description: Optional[str] = None) -> str:
         """Create and save a new workflow"""
-        workflow_id = f"wf_{hash(name)}_{datetime.utcnow().timestamp()}"
+        workflow_id = f"wf_{_content_digest(name)}_{datetime.utcnow().timestamp()}"
         
         workflow = {
             'id': workflow_id,
@@ -156,16 +169,19 @@ class WorkflowEngine:
     # Private helper methods
     async def _calculate_complexity(self, steps: List[Dict]) -> float:
         """Calculate workflow complexity score"""
-        complexity_factors = {
-            'step_count': len(steps),
-            'conditionals': len([s for s in steps if s.get('type') == 'condition']),
-            'external_actions': len([s for s in steps if s.get('type') in ['app_operation', 'file_operation']]),
-        }
+        # Count conditionals and external actions in a single pass
+        conditionals = external_actions = 0
+        for step in steps:
+            step_type = step.get('type')
+            if step_type == 'condition':
+                conditionals += 1
+            elif step_type == 'app_operation' or step_type == 'file_operation':
+                external_actions += 1
         
         score = min(1.0, (
-            complexity_factors['step_count'] * 0.1 +
-            complexity_factors['conditionals'] * 0.4 +
-            complexity_factors['external_actions'] * 0.5
+            len(steps) * 0.1 +
+            conditionals * 0.4 +
+            external_actions * 0.5
         ))
         
         return round(score, 2)
@@ -214,24 +230,22 @@ class WorkflowEngine:
         else:
             raise ValueError(f"Unknown step type: {step_type}")
 
-    def _get_next_step(self, steps: List[Dict], current_step: Dict, context: Dict) -> Optional[Dict]:
+    def _get_next_step(self, steps_by_id: Dict[Any, Dict], current_step: Dict, context: Dict) -> Optional[Dict]:
         """Determine the next step to execute"""
         if not current_step.get('nextStep'):
             return None
         
-        next_step_id = current_step['nextStep']
-        return next((step for step in steps if step['id'] == next_step_id), None)
+        return steps_by_id.get(current_step['nextStep'])
 
     def _resolve_parameters(self, parameters: Dict, context: Dict) -> Dict:
         """Resolve parameter templates with context values"""
-        resolved = {}
+        resolved = dict(parameters)
         for key, value in parameters.items():
-            if isinstance(value, str) and value.startswith('${') and value.endswith('}'):
-                # Simple template resolution
-                context_key = value[2:-1]
-                resolved[key] = context.get(context_key, value)
-            else:
-                resolved[key] = value
+            # Simple template resolution of whole-value "${name}" parameters
+            if isinstance(value, str) and '$' in value:
+                template = _TEMPLATE_RE.fullmatch(value)
+                if template:
+                    resolved[key] = context.get(template.group(1), value)
         return resolved
 
     async def _execute_system_command(self, command: str, parameters: Dict) -> Dict:
@@ -1,6 +1,21 @@
 # services/ai-gateway/models/base_models.py
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, BeforeValidator
+from typing import Annotated, List, Dict, Any, Optional
+import base64
+import binascii
+import msgspec
+
+def _decode_base64(value):
+    if not isinstance(value, str):
+        return value
+    try:
+        return base64.b64decode(value, validate=True)
+    except binascii.Error as e:
+        raise ValueError(f"Invalid base64 data: {e}")
+
+# Audio sent as a base64 string, decoded once during validation; characters
+# outside the base64 alphabet are rejected rather than silently dropped
+Base64Audio = Annotated[bytes, BeforeValidator(_decode_base64)]
 
 class AIRequest(BaseModel):
     prompt: str
@@ -17,7 +32,7 @@ class AIResponse(BaseModel):
     processing_time: float
 
 class VoiceCommandRequest(BaseModel):
-    audio_data: str  # base64 encoded
+    audio_data: Base64Audio  # base64 encoded on the wire
     language: str = "en-US"
 
 class VoiceCommandResponse(BaseModel):
@@ -36,3 +51,20 @@ class SystemCommandResponse(BaseModel):
     success: bool
     result: Any
     message: str
+
+# msgspec mirrors of the AI request/response models, used on the
+# /ai/process hot path. The Pydantic models above still drive the
+# OpenAPI schema.
+class AIRequestStruct(msgspec.Struct):
+    prompt: str
+    context: Dict[str, Any] = {}
+    model_preference: Optional[str] = None
+    max_tokens: int = 1000
+    temperature: float = 0.7
+
+class AIResponseStruct(msgspec.Struct):
+    text: str
+    model_used: str
+    tokens_used: int
+    confidence: float
+    processing_time: float
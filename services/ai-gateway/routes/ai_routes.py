@@ -1,10 +1,16 @@
 # services/ai-gateway/routes/ai_routes.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any
+from collections import deque
 import asyncio
 import logging
+import re
+import time
+import msgspec
 
-from models.base_models import AIRequest, AIResponse
+from models.base_models import AIRequest, AIResponse, AIRequestStruct, AIResponseStruct
+from core.command_processor import CommandProcessor
 from core.model_selector import ModelSelector
 from providers.model_registry import ModelRegistry
 from utils.config import load_config
@@ -12,87 +18,233 @@ from utils.metrics import MetricsCollector
 
 router = APIRouter(tags=["ai"])
 
+# Keywords that route a prompt to the system command path
+SYSTEM_KEYWORDS = ('open', 'close', 'launch', 'start', 'quit', 'exit', 'search', 'find')
+
+# Match all keywords in a single pass; fall back to a regex alternation
+# when pyahocorasick is not installed
+try:
+    import ahocorasick
+    _system_keyword_automaton = ahocorasick.Automaton()
+    for _keyword in SYSTEM_KEYWORDS:
+        _system_keyword_automaton.add_word(_keyword, _keyword)
+    _system_keyword_automaton.make_automaton()
+    _system_keyword_regex = None
+except ImportError:
+    _system_keyword_automaton = None
+    _system_keyword_regex = re.compile('|'.join(map(re.escape, SYSTEM_KEYWORDS)))
+
+# System prompts keyed by request source
+_BASE_SYSTEM_PROMPT = "You are a helpful AI assistant with system integration capabilities."
+_SYSTEM_PROMPTS = {
+    "voice": _BASE_SYSTEM_PROMPT + " This is a voice command, so keep responses brief and actionable."
+}
+
+# Request/response codecs for /ai/process
+_ai_request_decoder = msgspec.json.Decoder(AIRequestStruct)
+_ai_response_encoder = msgspec.json.Encoder()
+_AI_REQUEST_OPENAPI = {
+    "requestBody": {
+        "content": {"application/json": {"schema": AIRequest.model_json_schema()}},
+        "required": True
+    }
+}
+
+# Per-request metrics are appended to a bounded ring and aggregated by a
+# background task, so the request path never touches the collectors
+METRICS_RING_SIZE = 8192
+METRICS_FLUSH_INTERVAL = 1.0
+METRICS_EXPOSITION_TTL = 1.0
+_metrics_ring = deque(maxlen=METRICS_RING_SIZE)
+_metrics_exposition = {"expires": 0.0, "body": b""}
+
+# Prometheus export is optional; without prometheus_client the aggregator
+# only feeds the metrics collector and /metrics is unavailable
+try:
+    from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+
+    prometheus_registry = CollectorRegistry()
+    _requests_total = Counter(
+        'ai_requests_total', 'AI requests processed', ['provider'], registry=prometheus_registry
+    )
+    _tokens_total = Counter(
+        'ai_tokens_total', 'Tokens used by AI requests', ['provider'], registry=prometheus_registry
+    )
+    _processing_seconds = Histogram(
+        'ai_processing_seconds', 'AI request processing time', ['provider'], registry=prometheus_registry
+    )
+    _metrics_writes = Counter(
+        'ai_metrics_writes_total', 'Metric records drained from the ring into the collectors', registry=prometheus_registry
+    )
+    _metrics_dropped = Counter(
+        'ai_metrics_dropped_total', 'Metric records dropped because the ring was full', registry=prometheus_registry
+    )
+    _metrics_failures = Counter(
+        'ai_metrics_failures_total', 'Metric records the collector failed to store', registry=prometheus_registry
+    )
+except ImportError:
+    prometheus_registry = None
+
 # Global instances
 model_registry = None
 model_selector = None
 metrics = None
+command_processor = None
+metrics_aggregator = None
 
-async def initialize():
-    global model_registry, model_selector, metrics
+async def initialize(shared_command_processor: CommandProcessor):
+    global model_registry, model_selector, metrics, command_processor, metrics_aggregator
     config = load_config()
     model_registry = ModelRegistry(config)
     model_selector = ModelSelector(model_registry.get_providers())
     metrics = MetricsCollector()
+    command_processor = shared_command_processor
     await model_registry.initialize_providers()
+    metrics_aggregator = asyncio.create_task(_aggregate_metrics())
 
 async def cleanup():
+    if metrics_aggregator:
+        metrics_aggregator.cancel()
+        try:
+            await metrics_aggregator
+        except asyncio.CancelledError:
+            pass
+        await _flush_metrics()
     if model_registry:
         await model_registry.cleanup()
 
-@router.post("/ai/process", response_model=AIResponse)
-async def process_ai_request(request: AIRequest):
+# The body is encoded by msgspec, so AIResponse only documents it
+@router.post("/ai/process", responses={200: {"model": AIResponse}}, openapi_extra=_AI_REQUEST_OPENAPI)
+async def process_ai_request(http_request: Request):
     """Unified AI processing endpoint"""
-    start_time = asyncio.get_event_loop().time()
-    
+    start_time = time.perf_counter()
+
+    try:
+        request = _ai_request_decoder.decode(await http_request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
     try:
         # Check if this is a system command
-        if await _is_system_command(request.prompt):
-            response = await _process_system_command(request)
+        if _is_system_command(request.prompt):
+            response = _process_system_command(request)
         else:
             # Use AI model for complex requests
             response = await _process_ai_completion(request)
 
-        processing_time = asyncio.get_event_loop().time() - start_time
+        processing_time = time.perf_counter() - start_time
 
-        # Update metrics
-        await metrics.record_request(
-            provider=response.model_used,
-            processing_time=processing_time,
-            tokens_used=response.tokens_used
-        )
+        # Queue metrics for the background aggregator
+        _record_metrics(response.model_used, processing_time, response.tokens_used)
 
-        return response
+        return Response(_ai_response_encoder.encode(response), media_type="application/json")
 
     except Exception as e:
-        logging.error(f"AI processing failed: {str(e)}")
+        logging.error("AI processing failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/ai/stream", openapi_extra=_AI_REQUEST_OPENAPI)
+async def stream_ai_request(http_request: Request):
+    """Stream AI completion text as Server-Sent Events"""
+    try:
+        request = _ai_request_decoder.decode(await http_request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        model_selection = await model_selector.select_model(
+            prompt=request.prompt,
+            context=request.context,
+            user_preference=request.model_preference
+        )
+    except Exception as e:
+        logging.error("AI model selection failed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamingResponse(
+        _stream_completion(model_selection, request),
+        media_type="text/event-stream"
+    )
+
+@router.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus exposition, re-rendered at most once per second"""
+    if prometheus_registry is None:
+        raise HTTPException(status_code=503, detail="prometheus_client is not installed")
+    now = time.monotonic()
+    if now >= _metrics_exposition["expires"]:
+        _metrics_exposition["body"] = generate_latest(prometheus_registry)
+        _metrics_exposition["expires"] = now + METRICS_EXPOSITION_TTL
+    return Response(_metrics_exposition["body"], media_type=CONTENT_TYPE_LATEST)
+
 # Helper functions
-async def _is_system_command(prompt: str) -> bool:
-    system_keywords = ['open', 'close', 'launch', 'start', 'quit', 'exit', 'search', 'find']
+def _record_metrics(provider: str, processing_time: float, tokens_used: int):
+    if len(_metrics_ring) == METRICS_RING_SIZE and prometheus_registry is not None:
+        # The append below evicts the oldest record
+        _metrics_dropped.inc()
+    _metrics_ring.append((provider, processing_time, tokens_used))
+
+async def _flush_metrics():
+    """Drain the metrics ring into Prometheus and the metrics collector"""
+    while _metrics_ring:
+        provider, processing_time, tokens_used = _metrics_ring.popleft()
+        if prometheus_registry is not None:
+            _metrics_writes.inc()
+            _requests_total.labels(provider).inc()
+            _tokens_total.labels(provider).inc(tokens_used)
+            _processing_seconds.labels(provider).observe(processing_time)
+        try:
+            await metrics.record_request(
+                provider=provider,
+                processing_time=processing_time,
+                tokens_used=tokens_used
+            )
+        except Exception as e:
+            if prometheus_registry is not None:
+                _metrics_failures.inc()
+            logging.warning("Failed to record request metrics: %s", e)
+
+async def _aggregate_metrics():
+    while True:
+        await asyncio.sleep(METRICS_FLUSH_INTERVAL)
+        await _flush_metrics()
+
+def _is_system_command(prompt: str) -> bool:
     prompt_lower = prompt.lower()
-    return any(keyword in prompt_lower for keyword in system_keywords)
+    if _system_keyword_automaton is not None:
+        return next(_system_keyword_automaton.iter(prompt_lower), None) is not None
+    return _system_keyword_regex.search(prompt_lower) is not None
+
+def _process_system_command(request: AIRequestStruct) -> AIResponseStruct:
+    start_time = time.perf_counter()
+    # Only in-process commands are dispatched here; prompts are never run as shell commands
+    result = command_processor.execute_sync(request.prompt, request.context)
+    if result is None:
+        result = {'response': "System command processed", 'confidence': 0.9}
 
-async def _process_system_command(request: AIRequest) -> AIResponse:
-    # This would integrate with command processor
-    return AIResponse(
-        text="System command processed",
+    return AIResponseStruct(
+        text=result['response'],
         model_used="system-command",
         tokens_used=0,
-        confidence=0.9,
-        processing_time=0.1
+        confidence=result['confidence'],
+        processing_time=time.perf_counter() - start_time
     )
 
-async def _process_ai_completion(request: AIRequest) -> AIResponse:
+async def _process_ai_completion(request: AIRequestStruct) -> AIResponseStruct:
     model_selection = await model_selector.select_model(
         prompt=request.prompt,
         context=request.context,
         user_preference=request.model_preference
     )
 
-    messages = [
-        {"role": "system", "content": _get_system_prompt(request.context)},
-        {"role": "user", "content": request.prompt}
-    ]
-
     response = await model_selection.provider.chat_completion(
-        messages=messages,
+        messages=_build_messages(request),
         model=model_selection.model,
         max_tokens=request.max_tokens,
         temperature=request.temperature
     )
 
-    return AIResponse(
+    return AIResponseStruct(
         text=response.text,
         model_used=response.model,
         tokens_used=response.tokens_used,
@@ -100,8 +252,33 @@ async def _process_ai_completion(request: AIRequest) -> AIResponse:
         processing_time=response.processing_time
     )
 
+async def _stream_completion(model_selection, request: AIRequestStruct):
+    """Yield SSE events for a completion, one per provider chunk"""
+    provider = model_selection.provider
+    completion_args = {
+        "messages": _build_messages(request),
+        "model": model_selection.model,
+        "max_tokens": request.max_tokens,
+        "temperature": request.temperature
+    }
+    try:
+        if hasattr(provider, "chat_completion_stream"):
+            async for chunk in provider.chat_completion_stream(**completion_args):
+                yield b"data: " + _ai_response_encoder.encode({"t": chunk}) + b"\n\n"
+        else:
+            # Providers without streaming support send the whole completion as one event
+            response = await provider.chat_completion(**completion_args)
+            yield b"data: " + _ai_response_encoder.encode({"t": response.text}) + b"\n\n"
+        yield b"data: [DONE]\n\n"
+    except Exception as e:
+        logging.error("AI streaming failed: %s", e)
+        yield b"event: error\ndata: " + _ai_response_encoder.encode({"error": str(e)}) + b"\n\n"
+
+def _build_messages(request: AIRequestStruct):
+    return [
+        {"role": "system", "content": _get_system_prompt(request.context)},
+        {"role": "user", "content": request.prompt}
+    ]
+
 def _get_system_prompt(context: Dict[str, Any]) -> str:
-    base_prompt = "You are a helpful AI assistant with system integration capabilities."
-    if context.get("source") == "voice":
-        base_prompt += " This is a voice command, so keep responses brief and actionable."
-    return base_prompt
+    return _SYSTEM_PROMPTS.get(context.get("source"), _BASE_SYSTEM_PROMPT)
@@ -38,18 +38,19 @@ async def execute_system_command(request: SystemCommandRequest):
             request.command,
             request.parameters
         )
-        return SystemCommandResponse(
+        response = SystemCommandResponse(
             success=True,
             result=result,
             message="Command executed successfully"
         )
     except Exception as e:
         logging.error(f"System command execution failed: {str(e)}")
-        return SystemCommandResponse(
+        response = SystemCommandResponse(
             success=False,
             result=None,
             message=str(e)
         )
+    return response
 
 @router.post("/system/applications/{app_name}/launch")
 async def launch_application(app_name: str):
@@ -1,7 +1,11 @@
 # services/ai-gateway/routes/voice_routes.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import hashlib
 import logging
 import asyncio
+import time
+import orjson
 
 from models.base_models import VoiceCommandRequest, VoiceCommandResponse
 from core.intent_analyzer import IntentAnalyzer
@@ -14,6 +18,11 @@ router = APIRouter(tags=["voice"])
 intent_analyzer = None
 workflow_engine = None
 
+# Cached /voice/voices payload: serialized once per TTL window
+VOICES_CACHE_TTL = 30.0
+_voices_cache = {"expires": 0.0, "body": b"", "etag": ""}
+_voices_lock = asyncio.Lock()
+
 async def initialize():
     global intent_analyzer, workflow_engine
     config = load_config()
@@ -44,9 +53,33 @@ async def process_voice_command(request: VoiceCommandRequest):
     """
     Complete voice command processing pipeline with workflow support
     """
+    return await _process_voice_command(request.audio_data, request.language)
+
+# The upload body is the audio file itself, not JSON or multipart form data
+_AUDIO_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}},
+        "required": True
+    }
+}
+
+@router.post("/voice/command/upload", response_model=VoiceCommandResponse, openapi_extra=_AUDIO_UPLOAD_OPENAPI)
+async def process_voice_command_upload(request: Request, language: str = "en-US"):
+    """
+    Voice command pipeline for raw audio sent as the request body
+    (Content-Type: application/octet-stream), with the language as a query
+    parameter; avoids the base64 overhead of /voice/command
+    """
+    audio_data = bytearray()
+    async for chunk in request.stream():
+        audio_data.extend(chunk)
+    return await _process_voice_command(bytes(audio_data), language)
+
+async def _process_voice_command(audio_data: bytes, language: str):
+    """Shared STT → intent → workflow pipeline for both command endpoints"""
     try:
         # 1. Speech to Text
-        transcript = await _transcribe_audio(request.audio_data, request.language)
+        transcript = await _transcribe_audio(audio_data, language)
 
         # 2. Intent Analysis with workflow detection
         intent_result = await intent_analyzer.analyze(transcript.text)
@@ -59,7 +92,7 @@ async def process_voice_command(request: VoiceCommandRequest):
                 intent_result = _merge_intents(intent_result, workflow_intent)
 
         # 4. Return structured command
-        return VoiceCommandResponse(
+        response = VoiceCommandResponse(
             transcript=transcript.text,
             intent=intent_result.intent,
             confidence=intent_result.confidence * transcript.confidence,  # Combined confidence
@@ -67,6 +100,7 @@ async def process_voice_command(request: VoiceCommandRequest):
             action=intent_result.action,
             parameters=intent_result.parameters
         )
+        return response
 
     except Exception as e:
         logging.error(f"Voice command processing failed: {str(e)}")
@@ -92,13 +126,16 @@ async def synthesize_speech(text: str, voice: str = "default"):
     """Text-to-speech synthesis"""
     try:
         audio_data = await _synthesize_speech(text, voice)
-        return {
-            "audio_data": audio_data,  # base64
-            "format": "wav",
-            "sample_rate": 24000,
-            "voice": voice,
-            "text_length": len(text)
-        }
+        # Encoded audio gains little from gzip; app.py excludes this path from it
+        return ORJSONResponse(
+            content={
+                "audio_data": audio_data,  # base64
+                "format": "wav",
+                "sample_rate": 24000,
+                "voice": voice,
+                "text_length": len(text)
+            }
+        )
     except Exception as e:
         logging.error(f"Speech synthesis failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -115,41 +152,57 @@ async def stream_voice_command(request: VoiceCommandRequest):
             # Simulate streaming transcription
             words = ["Processing", "voice", "command", "..."]
             for word in words:
-                yield {
+                yield _sse_event({
                     "type": "partial",
                     "text": word,
                     "is_final": False
-                }
+                })
                 await asyncio.sleep(0.1)
             
             final_transcript = await _transcribe_audio(request.audio_data, request.language)
-            yield {
+            yield _sse_event({
                 "type": "final",
                 "text": final_transcript.text,
                 "is_final": True,
                 "confidence": final_transcript.confidence
-            }
+            })
 
-        return generate_transcriptions()
+        return StreamingResponse(generate_transcriptions(), media_type="text/event-stream")
         
     except Exception as e:
         logging.error(f"Voice streaming failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/voice/voices")
-async def get_available_voices():
+async def get_available_voices(request: Request):
     """Get available TTS voices"""
     try:
-        voices = await _get_available_voices()
-        return {
-            "voices": voices,
-            "default_voice": "default"
-        }
+        if time.monotonic() >= _voices_cache["expires"]:
+            async with _voices_lock:
+                # Another request may have refreshed the cache while we waited
+                if time.monotonic() >= _voices_cache["expires"]:
+                    voices = await _get_available_voices()
+                    body = orjson.dumps({
+                        "voices": voices,
+                        "default_voice": "default"
+                    })
+                    _voices_cache["body"] = body
+                    _voices_cache["etag"] = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+                    _voices_cache["expires"] = time.monotonic() + VOICES_CACHE_TTL
+
+        etag = _voices_cache["etag"]
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(_voices_cache["body"], media_type="application/json", headers={"ETag": etag})
     except Exception as e:
         logging.error(f"Failed to get available voices: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # Helper functions
+def _sse_event(payload) -> bytes:
+    """Encode one Server-Sent Events message"""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
 async def _is_workflow_voice_command(transcript: str) -> bool:
     """Detect workflow commands in voice transcripts"""
     workflow_phrases = [
@@ -203,7 +256,7 @@ def _merge_intents(original_intent, workflow_intent):
     
     return original_intent
 
-async def _transcribe_audio(audio_data: str, language: str):
+async def _transcribe_audio(audio_data: bytes, language: str):
     """Transcribe audio to text - integrates with your STT engine"""
     try:
         # This would integrate with your actual STT engine
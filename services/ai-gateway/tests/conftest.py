@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the gateway's top-level packages (core, models, routes)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routes import ai_routes
+
+def _client():
+    app = FastAPI()
+    app.include_router(ai_routes.router, prefix="/v1")
+    return TestClient(app)
+
+class _FakeProvider:
+    async def chat_completion(self, messages, model, max_tokens, temperature):
+        return SimpleNamespace(text="hello", model=model, tokens_used=3,
+                               confidence=0.9, processing_time=0.01)
+
+class _FakeSelector:
+    async def select_model(self, prompt, context, user_preference):
+        return SimpleNamespace(provider=_FakeProvider(), model="fake-model")
+
+def test_process_returns_ai_response(monkeypatch):
+    monkeypatch.setattr(ai_routes, "model_selector", _FakeSelector())
+    response = _client().post("/v1/ai/process", json={"prompt": "tell me a joke"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    body = response.json()
+    assert body["text"] == "hello"
+    assert body["model_used"] == "fake-model"
+    assert body["tokens_used"] == 3
+
+def test_process_missing_field_is_422():
+    response = _client().post("/v1/ai/process", json={"context": {}})
+    assert response.status_code == 422
+    assert response.json() == {"detail": "Object missing required field `prompt`"}
+
+def test_process_wrong_type_is_422():
+    response = _client().post("/v1/ai/process", json={"prompt": 42})
+    assert response.status_code == 422
+    assert response.json() == {"detail": "Expected `str`, got `int` - at `$.prompt`"}
+
+def test_process_malformed_json_is_422():
+    response = _client().post("/v1/ai/process", content=b'{"prompt": "x",}',
+                              headers={"content-type": "application/json"})
+    assert response.status_code == 422
+    assert response.json() == {"detail": "JSON is malformed: trailing comma in object (byte 15)"}
+
+def test_process_truncated_json_is_422():
+    response = _client().post("/v1/ai/process", content=b'{"prompt": ',
+                              headers={"content-type": "application/json"})
+    assert response.status_code == 422
+    assert response.json() == {"detail": "Input data was truncated"}
+
+def test_process_documents_ai_response_schema():
+    operation = _client().app.openapi()["paths"]["/v1/ai/process"]["post"]
+    schema = operation["responses"]["200"]["content"]["application/json"]["schema"]
+    assert schema == {"$ref": "#/components/schemas/AIResponse"}
+
+class _FakeStreamingProvider:
+    async def chat_completion_stream(self, messages, model, max_tokens, temperature):
+        for chunk in ("Hel", "lo\n", "\"quoted\""):
+            yield chunk
+
+class _FailingStreamProvider:
+    async def chat_completion_stream(self, messages, model, max_tokens, temperature):
+        yield "partial"
+        raise RuntimeError("provider went away")
+
+def _stream(monkeypatch, provider):
+    async def select_model(prompt, context, user_preference):
+        return SimpleNamespace(provider=provider, model="fake-model")
+    monkeypatch.setattr(ai_routes, "model_selector", SimpleNamespace(select_model=select_model))
+    return _client().post("/v1/ai/stream", json={"prompt": "tell me a joke"})
+
+def test_stream_sends_one_event_per_chunk(monkeypatch):
+    response = _stream(monkeypatch, _FakeStreamingProvider())
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.content == (
+        b'data: {"t":"Hel"}\n\n'
+        b'data: {"t":"lo\\n"}\n\n'
+        b'data: {"t":"\\"quoted\\""}\n\n'
+        b'data: [DONE]\n\n'
+    )
+
+def test_stream_without_provider_streaming_sends_one_event(monkeypatch):
+    response = _stream(monkeypatch, _FakeProvider())
+    assert response.content == b'data: {"t":"hello"}\n\ndata: [DONE]\n\n'
+
+def test_stream_failure_ends_with_error_event(monkeypatch):
+    response = _stream(monkeypatch, _FailingStreamProvider())
+    assert response.content == (
+        b'data: {"t":"partial"}\n\n'
+        b'event: error\ndata: {"error":"provider went away"}\n\n'
+    )
+
+def test_stream_invalid_body_is_422():
+    response = _client().post("/v1/ai/stream", json={})
+    assert response.status_code == 422
+    assert response.json() == {"detail": "Object missing required field `prompt`"}
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import signal
+
+import pytest
+
+from core import command_processor
+from core.command_processor import CommandProcessor
+
+pytestmark = pytest.mark.skipif(os.name != 'posix', reason="pooled shells are POSIX only")
+
+def _run(coroutine_function):
+    async def main():
+        processor = CommandProcessor()
+        try:
+            return await coroutine_function(processor)
+        finally:
+            await processor.cleanup()
+    return asyncio.run(main())
+
+def test_returns_status_and_output():
+    async def check(processor):
+        returncode, stdout, stderr = await processor._run_in_shell("echo out; echo err >&2; exit 3")
+        assert returncode == 3
+        assert stdout.strip() == b"out"
+        assert stderr.strip() == b"err"
+    _run(check)
+
+def test_worker_is_reused_and_state_does_not_leak():
+    async def check(processor):
+        await processor._run_in_shell("cd /; export KRUBOO_TEST=1")
+        worker = processor._idle_shells[0]
+        _, stdout, _ = await processor._run_in_shell('pwd; echo "${KRUBOO_TEST:-unset}"')
+        assert processor._idle_shells == [worker]
+        assert stdout.split() == [os.getcwd().encode(), b"unset"]
+    _run(check)
+
+def test_dead_idle_worker_is_replaced():
+    async def check(processor):
+        await processor._run_in_shell("true")
+        dead = processor._idle_shells[0]
+        os.killpg(dead.process.pid, signal.SIGKILL)
+        await dead.process.wait()
+        _, stdout, _ = await processor._run_in_shell("echo alive")
+        assert stdout.strip() == b"alive"
+        assert processor._idle_shells and processor._idle_shells[0] is not dead
+    _run(check)
+
+def test_timeout_kills_the_worker(monkeypatch):
+    monkeypatch.setattr(command_processor, "_SHELL_COMMAND_TIMEOUT", 0.2)
+
+    async def check(processor):
+        await processor._run_in_shell("true")
+        worker = processor._idle_shells[0]
+        with pytest.raises(RuntimeError, match="timed out"):
+            await processor._run_in_shell("sleep 5")
+        assert worker.process.returncode is not None
+        assert processor._idle_shells == []
+        _, stdout, _ = await processor._run_in_shell("echo next")
+        assert stdout.strip() == b"next"
+    _run(check)
+
+def test_output_cap_aborts_the_command():
+    async def check(processor):
+        result = await processor._handle_generic_command("yes | head -c 4000000; sleep 5", {})
+        assert result['success'] is False
+        assert "exceeded" in result['response']
+        assert processor._idle_shells == []
+    _run(check)
+
+def test_cleanup_reaps_idle_workers():
+    async def check(processor):
+        await asyncio.gather(*(processor._run_in_shell("sleep 0.1") for _ in range(3)))
+        workers = list(processor._idle_shells)
+        assert len(workers) == 3
+        await processor.cleanup()
+        assert all(worker.process.returncode is not None for worker in workers)
+    _run(check)
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import time
+
+from core import file_system_controller
+from core.file_system_controller import FileSystemController
+
+def _make_tree(root, names):
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+    # Age every directory so the index does not treat it as just modified
+    old = time.time() - 60
+    for directory in [root, *(path for path in root.rglob('*') if path.is_dir())]:
+        os.utime(directory, (old, old))
+
+def _search(controller, query, directory):
+    return asyncio.run(controller._filename_search(query, str(directory), []))
+
+def _names(results):
+    return sorted(result['name'] for result in results)
+
+def test_finds_matches_in_every_subtree(tmp_path):
+    _make_tree(tmp_path, ["report.txt", "a/report-2024.pdf", "a/b/old_report.doc", "a/notes.txt"])
+    controller = FileSystemController()
+    results = _search(controller, "report", tmp_path)
+    assert _names(results) == ["old_report.doc", "report-2024.pdf", "report.txt"]
+    assert str(tmp_path) in controller._trigram_index
+
+def test_unmatched_query_skips_the_walk(tmp_path, monkeypatch):
+    _make_tree(tmp_path, ["report.txt", "a/notes.txt"])
+    controller = FileSystemController()
+    _search(controller, "report", tmp_path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("directory walked despite the trigram index")
+    monkeypatch.setattr(controller, "_match_files", fail)
+    assert _search(controller, "invoice", tmp_path) == []
+
+def test_new_file_is_found_after_the_index_is_built(tmp_path):
+    _make_tree(tmp_path, ["report.txt", "a/b/notes.txt"])
+    controller = FileSystemController()
+    assert _search(controller, "invoice", tmp_path) == []
+    (tmp_path / "a" / "b" / "invoice.pdf").touch()
+    assert _names(_search(controller, "invoice", tmp_path)) == ["invoice.pdf"]
+
+def test_expired_index_is_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_system_controller, "TRIGRAM_INDEX_TTL", 0.0)
+    _make_tree(tmp_path, ["report.txt"])
+    controller = FileSystemController()
+    _search(controller, "report", tmp_path)
+    first = controller._trigram_index[str(tmp_path)]
+    _search(controller, "report", tmp_path)
+    assert controller._trigram_index[str(tmp_path)] is not first
+
+def test_least_recently_used_roots_are_evicted(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_system_controller, "TRIGRAM_INDEX_MAX_ROOTS", 2)
+    roots = [tmp_path / name for name in ("one", "two", "three")]
+    for root in roots:
+        _make_tree(root, ["file.txt"])
+    controller = FileSystemController()
+    _search(controller, "file", roots[0])
+    _search(controller, "file", roots[1])
+    _search(controller, "file", roots[0])
+    _search(controller, "file", roots[2])
+    assert list(controller._trigram_index) == [str(roots[0]), str(roots[2])]
@@ -0,0 +1,9 @@
+import orjson
+
+from routes.voice_routes import _sse_event
+
+def test_sse_event_is_one_data_line_per_message():
+    event = _sse_event({"type": "partial", "text": "two\nlines", "is_final": False})
+    assert event == b'data: {"type":"partial","text":"two\\nlines","is_final":false}\n\n'
+    # The JSON payload never contains a raw newline, so it cannot split the event
+    assert orjson.loads(event[len(b"data: "):-2])["text"] == "two\nlines"
@@ -1,13 +1,17 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 import base64
 import logging
 import asyncio
+import time
 from datetime import datetime
 import aiohttp
 import json
+import orjson
 
 # Import our new local engine
 from core.local_voice_engine import LocalVoiceEngine, TranscriptionResult
@@ -17,10 +21,41 @@ from core.audio_pipeline import AudioProcessor
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("voice-service")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize services on startup and release them on shutdown"""
+    try:
+        # Open the shared AI Gateway session up front
+        await ai_client.ensure_session()
+
+        # Initialize the local voice engine and probe the AI Gateway together
+        _, ai_health = await asyncio.gather(
+            local_engine.initialize(),
+            ai_client.health_check()
+        )
+        logger.info("Local voice engine initialized successfully")
+
+        if ai_health["status"] == "connected":
+            logger.info("AI Gateway connection established")
+        else:
+            logger.warning(f"AI Gateway not available: {ai_health.get('error', 'Unknown error')}")
+            
+    except Exception as e:
+        logger.error(f"Startup failed: {e}")
+        # Service can still start, but some features may be limited
+
+    yield
+
+    if ai_client.session:
+        await ai_client.session.close()
+    logger.info("Voice Service shut down successfully")
+
 app = FastAPI(
     title="Voice Service", 
     version="2.0.0", 
-    description="Local-first voice processing integrated with AI Gateway"
+    description="Local-first voice processing integrated with AI Gateway",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -86,9 +121,15 @@ class AIGatewayClient:
         self.is_connected = False
     
     async def ensure_session(self):
-        if not self.session:
+        if not self.session or self.session.closed:
+            # One pooled session for every gateway call, so connections are reused
             self.session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=30)
+                connector=aiohttp.TCPConnector(
+                    limit=256,
+                    limit_per_host=64,
+                    keepalive_timeout=30
+                ),
+                timeout=aiohttp.ClientTimeout(total=30, sock_connect=2)
             )
     
     async def health_check(self) -> Dict[str, Any]:
@@ -213,46 +254,26 @@ class PluginManager:
 ai_client = AIGatewayClient()
 plugin_manager = PluginManager()
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize services on startup"""
-    try:
-        # Initialize local voice engine
-        await local_engine.initialize()
-        logger.info("Local voice engine initialized successfully")
-        
-        # Test AI Gateway connection
-        ai_health = await ai_client.health_check()
-        if ai_health["status"] == "connected":
-            logger.info("AI Gateway connection established")
-        else:
-            logger.warning(f"AI Gateway not available: {ai_health.get('error', 'Unknown error')}")
-            
-    except Exception as e:
-        logger.error(f"Startup failed: {e}")
-        # Service can still start, but some features may be limited
-
-@app.on_event("shutdown") 
-async def shutdown_event():
-    """Cleanup resources"""
-    if ai_client.session:
-        await ai_client.session.close()
-    logger.info("Voice Service shut down successfully")
-
 # Health and info endpoints
-@app.get("/health", response_model=HealthResponse)
-async def health_check():
-    """Comprehensive health check"""
-    local_health = await local_engine.health_check()
-    ai_health = await ai_client.health_check()
-    available_providers = await plugin_manager.get_available_providers()
+HEALTH_CACHE_TTL = 10.0
+READINESS_TIMEOUT = 1.0
+LIVEZ_BODY = orjson.dumps({"status": "ok"})
+_health_cache = {"expires": 0.0, "response": None}
+
+async def _probe_health() -> HealthResponse:
+    """Probe the local engine and the AI Gateway"""
+    # Probe everything concurrently so a slow gateway doesn't serialize the rest
+    local_health, ai_health = await asyncio.gather(
+        local_engine.health_check(),
+        ai_client.health_check()
+    )
     
     overall_status = "healthy" if (
         local_health.get("initialized", False) and 
         ai_health.get("status") == "connected"
     ) else "degraded"
     
-    return HealthResponse(
+    response = HealthResponse(
         status=overall_status,
         service="voice-service",
         timestamp=datetime.utcnow().isoformat(),
@@ -263,18 +284,44 @@ async def health_check():
             "tts": plugin_manager.active_tts
         }
     )
+    _health_cache["response"] = response
+    _health_cache["expires"] = time.monotonic() + HEALTH_CACHE_TTL
+    return response
+
+@app.get("/livez")
+async def livez():
+    """Liveness probe: the process is up, no dependencies are contacted"""
+    return Response(LIVEZ_BODY, media_type="application/json")
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness probe: live dependency check with a hard timeout"""
+    try:
+        health = await asyncio.wait_for(_probe_health(), timeout=READINESS_TIMEOUT)
+    except asyncio.TimeoutError:
+        return ORJSONResponse({"status": "not_ready", "reason": "health probe timed out"}, status_code=503)
+
+    ready = health.local_engine.get("initialized", False)
+    return ORJSONResponse(health.model_dump(), status_code=200 if ready else 503)
+
+@app.get("/health", response_model=HealthResponse)
+async def health_check():
+    """Comprehensive health check, served from cache for HEALTH_CACHE_TTL seconds"""
+    if time.monotonic() >= _health_cache["expires"]:
+        return await _probe_health()
+    return _health_cache["response"]
 
 @app.get("/providers")
 async def get_available_providers():
     """Get available STT/TTS providers"""
     providers = await plugin_manager.get_available_providers()
-    return {
+    return ORJSONResponse(content={
         "providers": providers,
         "defaults": {
             "stt": "local",
             "tts": "local"
         }
-    }
+    })
 
 # Core voice endpoints
 @app.post("/v1/transcribe")